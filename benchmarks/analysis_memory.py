@@ -0,0 +1,101 @@
+"""
+Analysis Memory Benchmark — pandas vs. streaming aggregation
+============================================================
+Runs the whole-history reports (monthly, top products, dashboard totals) in
+both modes and reports peak traced memory and wall time, then checks that
+the two modes agree to the paisa.
+
+    python benchmarks/analysis_memory.py
+    python benchmarks/analysis_memory.py --extra-sales 500000 --budget 8
+
+--extra-sales adds synthetic sales spread over two years inside a
+transaction that is rolled back at the end, so the database is unchanged.
+Peak memory is measured with tracemalloc (numpy buffers included), which
+also slows both modes down by a similar factor.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import transaction  # noqa: E402
+from django.test import override_settings  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from inventory import analysis  # noqa: E402
+from inventory.models import Product, Sale  # noqa: E402
+
+REPORTS = {
+    'monthly': analysis.get_monthly_sales_report,
+    'top_products': analysis.get_product_sales_chart_data,
+    'dashboard_stats': analysis.get_dashboard_stats,
+}
+
+
+def add_sales(count, batch_size=5000):
+    """Bulk-insert `count` random sales over the last two years."""
+    products = list(Product.objects.values_list('pk', 'price'))
+    now = timezone.now()
+    rng = random.Random(42)
+    for start in range(0, count, batch_size):
+        Sale.objects.bulk_create([
+            Sale(product_id=pk, quantity_sold=rng.randint(1, 5), sale_price=price,
+                 sale_date=now - timedelta(minutes=rng.randint(0, 2 * 365 * 24 * 60)))
+            for pk, price in (rng.choice(products) for _ in range(min(batch_size, count - start)))
+        ])
+
+
+def measure(report, streaming):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = report(streaming=streaming)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+
+def rounded(value):
+    """Normalise numpy/Decimal/float values so both modes compare exactly."""
+    if isinstance(value, dict):
+        return {key: rounded(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rounded(item) for item in value]
+    if isinstance(value, str):
+        return value
+    return round(Decimal(str(float(value))), 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--extra-sales', type=int, default=200000, help='Synthetic sales added for the run.')
+    parser.add_argument('--budget', type=float, default=None, help='ANALYTICS_MEMORY_BUDGET_MB for streaming.')
+    args = parser.parse_args()
+
+    overrides = {} if args.budget is None else {'ANALYTICS_MEMORY_BUDGET_MB': args.budget}
+    with transaction.atomic(), override_settings(**overrides):
+        add_sales(args.extra_sales)
+        print(f"{Sale.objects.count():,} sales")
+        print(f"{'report':<16} {'pandas MB':>10} {'pandas s':>9} {'stream MB':>10} {'stream s':>9}  same result")
+        for name, report in REPORTS.items():
+            before, before_s, before_mb = measure(report, streaming=False)
+            after, after_s, after_mb = measure(report, streaming=True)
+            print(f"{name:<16} {before_mb:>10.1f} {before_s:>9.2f} {after_mb:>10.1f} {after_s:>9.2f}  "
+                  f"{rounded(before) == rounded(after)}")
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
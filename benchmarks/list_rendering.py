@@ -0,0 +1,117 @@
+"""
+List Rendering Benchmark — rows per second for the long list pages
+==================================================================
+Renders products/list.html and sales/history.html with --rows rows each and
+reports rows rendered per second, query included. The current tree builds
+rows with inventory.rows; --before renders that revision's templates with
+model instances, the way its views did.
+
+    python benchmarks/list_rendering.py
+    python benchmarks/list_rendering.py --rows 10000 --before HEAD~1
+
+Products and sales are added as needed inside a transaction that is rolled
+back at the end, so the database is unchanged.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.template.loader import render_to_string  # noqa: E402
+from django.test import RequestFactory, override_settings  # noqa: E402
+
+from analysis_memory import add_sales  # noqa: E402
+from inventory import rows  # noqa: E402
+from inventory.forms import DateFilterForm  # noqa: E402
+from inventory.models import Category, Product, Sale  # noqa: E402
+
+
+def add_products(count, batch_size=5000):
+    categories = list(Category.objects.all()) or [None]
+    for start in range(0, count, batch_size):
+        Product.objects.bulk_create([
+            Product(name=f"Bench product {start + i}", category=categories[(start + i) % len(categories)],
+                    price=199, cost_price=120, quantity=(start + i) % 40, low_stock_threshold=10)
+            for i in range(min(batch_size, count - start))
+        ])
+
+
+def current_pages(count):
+    products = Product.objects.all()[:count]
+    sales = Sale.objects.order_by('-sale_date')[:count]
+    return {
+        'products/list.html': lambda: {'products': rows.product_rows(products), 'categories': []},
+        'sales/history.html': lambda: dict(zip(('sales', 'total_revenue'), rows.sale_rows(sales)),
+                                           form=DateFilterForm()),
+    }
+
+
+def legacy_pages(count):
+    products = Product.objects.select_related('category')[:count]
+    sales = Sale.objects.select_related('product__category').order_by('-sale_date')[:count]
+    return {
+        'products/list.html': lambda: {'products': products.all(), 'categories': []},
+        'sales/history.html': lambda: {'sales': sales.all(), 'form': DateFilterForm(), 'total_revenue': 0},
+    }
+
+
+def measure(pages, request, count, repeat):
+    """Best of `repeat` renders per template, as rows per second."""
+    results = {}
+    for template, context in pages.items():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            render_to_string(template, context(), request)
+            best = min(best, time.perf_counter() - started)
+        results[template] = count / best
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=10000, help='Rows per page (default: 10000).')
+    parser.add_argument('--repeat', type=int, default=3, help='Renders per page; the best is kept.')
+    parser.add_argument('--before', metavar='REF', help='Also render the templates at this git revision.')
+    args = parser.parse_args()
+
+    request = RequestFactory().get('/')
+    request.user = User.objects.filter(is_staff=True).first()
+
+    with transaction.atomic():
+        add_products(max(0, args.rows - Product.objects.count()))
+        add_sales(max(0, args.rows - Sale.objects.count()))
+
+        results = {'current': measure(current_pages(args.rows), request, args.rows, args.repeat)}
+        if args.before:
+            with tempfile.TemporaryDirectory() as scratch:
+                archive = subprocess.run(['git', 'archive', args.before, 'templates'],
+                                         cwd=BASE_DIR, capture_output=True, check=True).stdout
+                subprocess.run(['tar', '-x', '-C', scratch], input=archive, check=True)
+                templates = [{**settings.TEMPLATES[0], 'DIRS': [Path(scratch) / 'templates']}]
+                with override_settings(TEMPLATES=templates):
+                    results[args.before] = measure(legacy_pages(args.rows), request, args.rows, args.repeat)
+        transaction.set_rollback(True)
+
+    print(f"{args.rows:,} rows per page, best of {args.repeat}")
+    print(f"{'template':<22}" + ''.join(f"{name:>14}" for name in results))
+    for template in results['current']:
+        print(f"{template:<22}" + ''.join(f"{results[name][template]:>10,.0f} r/s" for name in results))
+
+
+if __name__ == '__main__':
+    main()
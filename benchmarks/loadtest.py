@@ -0,0 +1,285 @@
+"""
+Load Test — peak-hour traffic mix against a running server
+===========================================================
+Standard library only. Each virtual user logs in with its own session and
+loops over a weighted mix of actions until the duration is up:
+
+  record_sale        POST /sales/record/            (1 unit of a random product)
+  api_product_price  GET  /api/product-price/
+  dashboard          GET  /                          (--chart-api: then GET /api/chart-data/)
+  sale_history       GET  /sales/history/           (sometimes date-filtered)
+
+    python manage.py runserver --noreload            # or gunicorn, in another shell
+    python benchmarks/loadtest.py --username admin --password kartik123
+    python benchmarks/loadtest.py --concurrency 20 --duration 60 --output after.json --compare before.json
+
+Reports throughput, p50/p95/p99 latency and error rate per endpoint and writes
+a JSON results file that --compare can diff against a later run.
+record_sale really sells stock, so run it against a disposable database. A
+product found sold out at its location is restocked first (untimed), so sales
+keep succeeding however long the run.
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+DEFAULT_MIX = 'record_sale=2,api_product_price=4,dashboard=2,sale_history=2'
+SELECT_RE = r'<select name="{name}"[^>]*>(.*?)</select>'
+OPTION_RE = re.compile(r'<option value="(\d+)"')
+RESTOCK_UNITS = 100
+
+
+class NoRedirect(HTTPRedirectHandler):
+    """Surface 302s as responses — a redirect after POST means success."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+
+class Session:
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), NoRedirect)
+
+    def csrf_token(self):
+        return next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+
+    def request(self, path, data=None):
+        """Returns (status, body). Network errors are reported as status 0."""
+        url = self.base_url + path
+        body = urlencode(data, doseq=True).encode() if data is not None else None
+        req = Request(url, data=body, headers={'Referer': url})
+        try:
+            with self.opener.open(req, timeout=self.timeout) as resp:
+                return resp.status, resp.read().decode('utf-8', 'replace')
+        except HTTPError as exc:
+            return exc.code, ''
+        except (URLError, TimeoutError, ConnectionError):
+            return 0, ''
+
+    def login(self, username, password):
+        self.request('/login/')
+        status, _ = self.request('/login/', {
+            'csrfmiddlewaretoken': self.csrf_token(),
+            'username': username,
+            'password': password,
+        })
+        return status == 302
+
+
+class VirtualUser:
+    def __init__(self, session, product_ids, location_ids, stats, chart_api=False):
+        self.session = session
+        self.product_ids = product_ids
+        self.location_ids = location_ids
+        self.stats = stats
+        self.chart_api = chart_api
+
+    def timed(self, endpoint, path, data=None, ok_status=200):
+        started = time.perf_counter()
+        status, body = self.session.request(path, data)
+        self.stats.record(endpoint, time.perf_counter() - started, status == ok_status)
+        return body
+
+    def record_sale(self):
+        product_id = random.choice(self.product_ids)
+        location_id = random.choice(self.location_ids)
+        # The form's price lookup, made first and left out of the stats so
+        # api_product_price only counts its own weight in --mix
+        price, stock = self.lookup(product_id, location_id, recorded=False)
+        if stock < 1:
+            # Sold out: a rejected sale would count as an error, so restock
+            self.session.request(f'/products/{product_id}/stock/', {
+                'csrfmiddlewaretoken': self.session.csrf_token(),
+                'location': location_id,
+                'quantity_to_add': RESTOCK_UNITS,
+                'notes': 'Load test',
+            })
+        self.timed('record_sale', '/sales/record/', {
+            'csrfmiddlewaretoken': self.session.csrf_token(),
+            'product': product_id,
+            'location': location_id,
+            'quantity_sold': 1,
+            'sale_price': price,
+            'notes': 'Load test',
+        }, ok_status=302)
+
+    def lookup(self, product_id, location_id=None, recorded=True):
+        """(price, stock) from the sale form's product lookup."""
+        path = f'/api/product-price/?product_id={product_id}'
+        if location_id:
+            path += f'&location_id={location_id}'
+        body = self.timed('api_product_price', path) if recorded else self.session.request(path)[1]
+        try:
+            data = json.loads(body)
+            return data['price'], data['stock']
+        except (ValueError, KeyError):
+            return 1, 0
+
+    def api_product_price(self):
+        self.lookup(random.choice(self.product_ids))
+
+    def dashboard(self):
+        self.timed('dashboard', '/')
+        # The page embeds its chart series; only older builds fetch them separately
+        if self.chart_api:
+            self.timed('api_chart_data', '/api/chart-data/')
+
+    def sale_history(self):
+        path = '/sales/history/'
+        if random.random() < 0.3:
+            end = date.today()
+            start = end - timedelta(days=random.choice([7, 30, 90]))
+            path += '?' + urlencode({'start_date': start.isoformat(), 'end_date': end.isoformat()})
+        self.timed('sale_history', path)
+
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(seconds)
+            self.errors[endpoint] = self.errors.get(endpoint, 0) + (not ok)
+
+    def summary(self, elapsed):
+        result = {}
+        for endpoint, samples in sorted(self.latencies.items()):
+            samples = sorted(samples)
+            result[endpoint] = {
+                'requests': len(samples),
+                'throughput_rps': round(len(samples) / elapsed, 2),
+                'p50_ms': round(percentile(samples, 50) * 1000, 1),
+                'p95_ms': round(percentile(samples, 95) * 1000, 1),
+                'p99_ms': round(percentile(samples, 99) * 1000, 1),
+                'error_rate': round(self.errors[endpoint] / len(samples), 4),
+            }
+        return result
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, round(pct / 100 * len(sorted_samples)))
+    return sorted_samples[min(rank, len(sorted_samples)) - 1]
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(','):
+        name, _, weight = part.partition('=')
+        if name not in ('record_sale', 'api_product_price', 'dashboard', 'sale_history'):
+            raise SystemExit(f"Unknown action in --mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def discover_choices(session):
+    """Product and location ids from the sale form's <select> options."""
+    _, page = session.request('/sales/record/')
+    found = {}
+    for name in ('product', 'location'):
+        match = re.search(SELECT_RE.format(name=name), page, re.S)
+        found[name] = OPTION_RE.findall(match.group(1)) if match else []
+    return found['product'], found['location']
+
+
+def print_table(summary, elapsed, concurrency):
+    print(f"\n{concurrency} users, {elapsed:.1f}s")
+    print(f"{'endpoint':<18} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, s in summary.items():
+        print(f"{endpoint:<18} {s['requests']:>8} {s['throughput_rps']:>8.1f} {s['p50_ms']:>8.1f} "
+              f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate']:>7.1%}")
+
+
+def print_comparison(summary, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)['endpoints']
+    print(f"\nvs. {baseline_path}")
+    print(f"{'endpoint':<18} {'req/s':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for endpoint, s in summary.items():
+        b = baseline.get(endpoint)
+        if not b:
+            continue
+        print(f"{endpoint:<18} {s['throughput_rps'] - b['throughput_rps']:>+10.1f} "
+              f"{s['p95_ms'] - b['p95_ms']:>+10.1f} {s['p99_ms'] - b['p99_ms']:>+10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--username', default='admin')
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--concurrency', type=int, default=10, help='Virtual users.')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run.')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Action weights (default: {DEFAULT_MIX}).')
+    parser.add_argument('--chart-api', action='store_true',
+                        help='Also fetch /api/chart-data/ after each dashboard load, as builds '
+                             'before the embedded chart data did.')
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--output', help='Results file (default: loadtest-<timestamp>.json).')
+    parser.add_argument('--compare', help='Earlier results file to diff against.')
+    args = parser.parse_args()
+
+    mix = parse_mix(args.mix)
+    stats = Stats()
+    users = []
+    for _ in range(args.concurrency):
+        session = Session(args.url, args.timeout)
+        if not session.login(args.username, args.password):
+            raise SystemExit(f"Login failed for '{args.username}' at {args.url}")
+        users.append(session)
+
+    product_ids, location_ids = discover_choices(users[0])
+    if not product_ids or not location_ids:
+        raise SystemExit("No products or locations found on the sale form — load sample data first.")
+
+    deadline = time.monotonic() + args.duration
+    actions, weights = list(mix), list(mix.values())
+
+    def run(session):
+        user = VirtualUser(session, product_ids, location_ids, stats, args.chart_api)
+        while time.monotonic() < deadline:
+            getattr(user, random.choices(actions, weights)[0])()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=run, args=(s,)) for s in users]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    summary = stats.summary(elapsed)
+    print_table(summary, elapsed, args.concurrency)
+
+    output = args.output or f"loadtest-{datetime.now():%Y%m%d-%H%M%S}.json"
+    with open(output, 'w') as f:
+        json.dump({
+            'url': args.url,
+            'concurrency': args.concurrency,
+            'duration_s': round(elapsed, 2),
+            'mix': mix,
+            'chart_api': args.chart_api,
+            'endpoints': summary,
+        }, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        print_comparison(summary, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Page Weight Report — bytes on the wire for the heavy pages, before vs. after
+===========================================================================
+Renders each page with the Django test client against the configured
+database, runs collectstatic into a scratch directory and adds up what a
+browser downloads from this app (CDN assets are identical in both modes and
+left out):
+
+  first view   HTML + every same-origin stylesheet/script, compressed if the
+               storage wrote a .gz sibling (WhiteNoise serves it)
+  repeat view  HTML again, plus one revalidation request per asset whose URL is
+               not fingerprinted (WhiteNoise caches those for 60s only)
+
+    python benchmarks/page_weight.py                      # current tree only
+    python benchmarks/page_weight.py --before HEAD~1      # vs. an older commit
+
+--before extracts templates/ and static/ from that git revision and serves
+them with the plain StaticFilesStorage the app used before fingerprinting.
+Nothing is written to the database; the login session is rolled back.
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import transaction  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+
+PAGES = [
+    ('login', '/login/', False),
+    ('dashboard', '/', True),
+    ('sale_history', '/sales/history/', True),
+    ('product_list', '/products/', True),
+]
+PLAIN_STORAGE = 'django.contrib.staticfiles.storage.StaticFilesStorage'
+ASSET_RE = re.compile(r'<(?:link|script)\b[^>]*?(?:href|src)="([^"]+)"')
+INLINE_RE = re.compile(r'<(style|script)\b[^>]*>(.*?)</\1>', re.S)
+HASHED_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+
+
+def extract_revision(ref, target):
+    """Unpack templates/ and static/ as they were at `ref` into `target`."""
+    archive = subprocess.run(['git', 'archive', ref, 'templates', 'static'],
+                             cwd=BASE_DIR, capture_output=True, check=True).stdout
+    subprocess.run(['tar', '-x', '-C', str(target)], input=archive, check=True)
+
+
+def measure(templates_dir, static_dir, storage_backend, user):
+    """Collect static files, render every page and return per-page byte counts."""
+    templates = [dict(settings.TEMPLATES[0], DIRS=[templates_dir])]
+    storages = dict(settings.STORAGES, staticfiles={'BACKEND': storage_backend})
+    with tempfile.TemporaryDirectory() as static_root, override_settings(
+        TEMPLATES=templates, STATICFILES_DIRS=[static_dir], STATIC_ROOT=static_root, STORAGES=storages,
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        client = Client()
+        results = {}
+        for name, url, needs_login in PAGES:
+            if needs_login:
+                client.force_login(user)
+            else:
+                client.logout()
+            response = client.get(url)
+            assert response.status_code == 200, f"{url} returned {response.status_code}"
+            html = response.content.decode()
+            inline = sum(len(body.encode()) for _, body in INLINE_RE.findall(html))
+
+            assets, revalidated = 0, 0
+            for href in ASSET_RE.findall(html):
+                if not href.startswith(settings.STATIC_URL):
+                    continue
+                path = Path(static_root) / href[len(settings.STATIC_URL):].split('?')[0]
+                compressed = path.with_name(path.name + '.gz')
+                assets += (compressed if compressed.exists() else path).stat().st_size
+                if not HASHED_RE.search(path.name):
+                    revalidated += 1
+
+            results[name] = {
+                'html': len(response.content),
+                'inline': inline,
+                'assets': assets,
+                'first_view': len(response.content) + assets,
+                'repeat_view': len(response.content),
+                'revalidations': revalidated,
+            }
+        return results
+
+
+def print_table(label, results):
+    print(f"\n{label}")
+    print(f"{'page':<14} {'HTML':>9} {'inline':>9} {'assets':>9} {'first':>9} {'repeat':>9} {'304s':>5}")
+    for name, r in results.items():
+        print(f"{name:<14} {r['html']:>9,} {r['inline']:>9,} {r['assets']:>9,} "
+              f"{r['first_view']:>9,} {r['repeat_view']:>9,} {r['revalidations']:>5}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--before', metavar='REF', help='Git revision to compare against.')
+    args = parser.parse_args()
+
+    setup_test_environment()
+    with transaction.atomic():
+        user = User.objects.create_user('page-weight-report')
+        runs = {}
+        if args.before:
+            with tempfile.TemporaryDirectory() as old_tree:
+                extract_revision(args.before, old_tree)
+                runs[f'before ({args.before})'] = measure(
+                    Path(old_tree) / 'templates', Path(old_tree) / 'static', PLAIN_STORAGE, user)
+        runs['after (working tree)'] = measure(
+            BASE_DIR / 'templates', BASE_DIR / 'static', settings.STORAGES['staticfiles']['BACKEND'], user)
+        transaction.set_rollback(True)
+
+    for label, results in runs.items():
+        print_table(label, results)
+
+    if args.before:
+        before, after = runs.values()
+        print("\nBytes saved per page view (first / repeat):")
+        for name in after:
+            print(f"  {name:<14} {before[name]['first_view'] - after[name]['first_view']:>+9,} "
+                  f"/ {before[name]['repeat_view'] - after[name]['repeat_view']:>+9,}")
+    print("\nHTML is sent uncompressed (no GZipMiddleware); 'inline' is the CSS/JS embedded in it.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Replenishment Simulation Benchmark — SKU-paths per second
+=========================================================
+Times inventory.simulation.simulate() on a synthetic catalogue, so the
+catalogue size does not depend on what is in the database.
+
+    python benchmarks/simulation_throughput.py
+    python benchmarks/simulation_throughput.py --skus 50000 --paths 1000 --workers 8
+
+Demand history is Poisson with a per-SKU rate; stock starts at 2–6 weeks of
+demand and the reorder point at one lead time of demand.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+
+from inventory import simulation  # noqa: E402
+
+
+def catalogue(skus, lookback, lead_time, rng):
+    rate = rng.gamma(1.5, 2.0, size=skus)
+    history = rng.poisson(rate[:, None], size=(skus, lookback)).astype(np.int32)
+    on_hand = (rate * rng.uniform(14, 42, size=skus)).astype(np.int32)
+    reorder_point = np.ceil(rate * lead_time).astype(np.int32)
+    cost_price = rng.uniform(10, 5000, size=skus)
+    return history, on_hand, reorder_point, cost_price
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--skus', type=int, default=50000)
+    parser.add_argument('--paths', type=int, default=1000)
+    parser.add_argument('--horizon', type=int, default=30)
+    parser.add_argument('--lead-time', type=int, default=7)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    history, on_hand, reorder_point, cost_price = catalogue(
+        args.skus, 90, args.lead_time, np.random.default_rng(42))
+    started = time.perf_counter()
+    result = simulation.simulate(
+        history, on_hand, reorder_point, cost_price, lead_time_days=args.lead_time,
+        horizon_days=args.horizon, paths=args.paths, seed=0, workers=args.workers,
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"{args.skus:,} SKUs × {args.paths:,} paths × {args.horizon} days, {args.workers} worker(s)")
+    print(f"  {elapsed:.1f}s  ({args.skus * args.paths / elapsed:,.0f} SKU-paths/s)")
+    print(f"  mean stock-out probability {result['stockout'].mean():.1%}, "
+          f"{(result['stockout'] >= 0.5).sum():,} SKUs at ≥50%")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""
+Sketch Analytics Benchmark — exact vs. approximate fast movers by window
+========================================================================
+Times get_fast_moving_products() exactly (pandas over the window's sales) and
+from the per-day sketches for growing windows, and checks every product's
+sketch estimate against its true units in the window.
+
+    python benchmarks/sketch_windows.py
+    python benchmarks/sketch_windows.py --extra-sales 1000000 --windows 30,365,730
+
+--extra-sales adds synthetic sales spread over two years inside a
+transaction that is rolled back at the end, so the database is unchanged.
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from datetime import timedelta  # noqa: E402
+
+from django.db import transaction  # noqa: E402
+from django.db.models import Sum  # noqa: E402
+from django.utils import timezone  # noqa: E402
+
+from analysis_memory import add_sales  # noqa: E402
+from inventory import analysis, sketches  # noqa: E402
+from inventory.models import Product, Sale  # noqa: E402
+
+
+def timed(function):
+    started = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - started
+
+
+def worst_error(days):
+    """(largest over-count of any product, how many exceed the stated bound, bound)."""
+    start = timezone.localdate() - timedelta(days=days - 1)
+    exact = dict(
+        Sale.objects.filter(sale_date__date__gte=start).values_list('product_id')
+        .annotate(units=Sum('quantity_sold')).order_by()
+    )
+    totals = sketches.window(days)
+    product_ids = list(Product.objects.values_list('pk', flat=True))
+    errors = [int(estimate) - exact.get(pk, 0) for pk, estimate in zip(product_ids, totals.estimate(product_ids))]
+    bound = totals.error_bound()
+    return max(errors), sum(1 for error in errors if error > bound), bound
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--extra-sales', type=int, default=200000, help='Synthetic sales added for the run.')
+    parser.add_argument('--windows', default='7,30,90,365,730', help='Comma-separated window lengths in days.')
+    args = parser.parse_args()
+
+    with transaction.atomic():
+        add_sales(args.extra_sales)
+        _, build_s = timed(sketches.rebuild)
+        sketches.window()  # fill in the running totals before timing queries
+        print(f"{Sale.objects.count():,} sales, {Product.objects.count():,} products; "
+              f"sketches built in {build_s:.1f}s")
+        print(f"{'days':>5} {'exact s':>8} {'sketch s':>9} {'top-5 overlap':>14} "
+              f"{'max over':>9} {'bound':>6} {'> bound':>8}")
+        for days in (int(day) for day in args.windows.split(',')):
+            exact, exact_s = timed(lambda: analysis.get_fast_moving_products(days, approximate=False))
+            approx, approx_s = timed(lambda: analysis.get_fast_moving_products(days, approximate=True))
+            overlap = len({row['product'] for row in exact} & {row['product'] for row in approx})
+            over, beyond, bound = worst_error(days)
+            print(f"{days:>5} {exact_s:>8.2f} {approx_s:>9.3f} {overlap:>14} {over:>9} {bound:>6} {beyond:>8}")
+        transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
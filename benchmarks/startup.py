@@ -0,0 +1,80 @@
+"""
+Startup Benchmark — worker boot time and memory, lazy vs. preloaded pandas
+==========================================================================
+Boots the WSGI application in fresh interpreters (one per simulated worker),
+resolves the URLconf so inventory.views is imported, and reports import time
+and RSS per worker.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --workers 5
+
+  before  ANALYTICS_PRELOAD=True  — pandas imported at boot (the old behaviour)
+  after   ANALYTICS_PRELOAD=False — pandas imported on first analysis request
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Runs inside each fresh interpreter
+WORKER_SCRIPT = """
+import json, os, resource, sys, time
+started = time.perf_counter()
+sys.path.insert(0, os.getcwd())
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+from inventory_project.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+with open('/proc/self/statm') as f:
+    rss_pages = int(f.read().split()[1])
+print(json.dumps({
+    'seconds': elapsed,
+    'rss_mb': rss_pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024,
+    'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'pandas_loaded': 'pandas' in sys.modules,
+}))
+"""
+
+
+def boot_worker(preload):
+    env = dict(os.environ, ANALYTICS_PRELOAD='True' if preload else 'False')
+    out = subprocess.run(
+        [sys.executable, '-c', WORKER_SCRIPT],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--workers', type=int, default=3, help='Fresh interpreters booted per mode.')
+    args = parser.parse_args()
+
+    results = {}
+    for label, preload in (('before', True), ('after', False)):
+        runs = [boot_worker(preload) for _ in range(args.workers)]
+        results[label] = {
+            'seconds': statistics.median(r['seconds'] for r in runs),
+            'rss_mb': statistics.median(r['rss_mb'] for r in runs),
+            'peak_rss_mb': statistics.median(r['peak_rss_mb'] for r in runs),
+            'pandas_loaded': runs[0]['pandas_loaded'],
+        }
+
+    print(f"{'mode':<8} {'boot (s)':>9} {'RSS (MB)':>9} {'peak (MB)':>10}  pandas loaded")
+    for label, r in results.items():
+        print(f"{label:<8} {r['seconds']:>9.3f} {r['rss_mb']:>9.1f} {r['peak_rss_mb']:>10.1f}  {r['pandas_loaded']}")
+
+    before, after = results['before'], results['after']
+    print()
+    print(f"Per worker: {before['seconds'] - after['seconds']:.3f}s faster boot, "
+          f"{before['rss_mb'] - after['rss_mb']:.1f} MB less RSS (median of {args.workers})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""
+Concurrency Benchmark — sale throughput vs. number of stock locations
+======================================================================
+Concurrent checkout threads sell one hot SKU. Each thread sells from
+location (thread % N), so with more locations the stock decrements land on
+different LocationStock rows instead of queueing on one.
+
+    python benchmarks/stock_contention.py
+    python benchmarks/stock_contention.py --threads 16 --locations 1,2,4,8 --shards 4
+
+--hold-ms keeps each sale transaction open after the decrement, modelling
+the rest of the checkout work done while the row lock is held.
+
+Row-level locking needs a server database (PostgreSQL via DATABASE_URL).
+SQLite locks the whole file on write, so it shows no scaling.
+Benchmark rows are created under a "Benchmark" prefix and deleted afterwards.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.db import connection, connections, transaction  # noqa: E402
+from django.db.utils import OperationalError  # noqa: E402
+
+from inventory import ledger  # noqa: E402
+from inventory.models import Location, Product, StockMovement  # noqa: E402
+
+
+def run_round(product, locations, threads, sales_per_thread, hold_ms):
+    """Run one timed round; returns (sales completed, seconds, errors)."""
+    completed = [0] * threads
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index):
+        location = locations[index % len(locations)]
+        try:
+            barrier.wait()
+            for _ in range(sales_per_thread):
+                with transaction.atomic():
+                    ledger.record_movement(product, -1, StockMovement.SALE, location=location,
+                                           notes='Benchmark sale')
+                    if hold_ms:
+                        time.sleep(hold_ms / 1000)
+                completed[index] += 1
+        except OperationalError as exc:
+            errors.append(exc)
+        finally:
+            connections.close_all()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for t in pool:
+        t.join()
+    elapsed = time.perf_counter() - started
+    return sum(completed), elapsed, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--sales', type=int, default=200, help='Sales per thread per round.')
+    parser.add_argument('--locations', default='1,2,4,8', help='Comma-separated location counts.')
+    parser.add_argument('--shards', type=int, default=2,
+                        help='Counter shards per location (>1 marks the SKU hot: no per-sale rollup).')
+    parser.add_argument('--hold-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.locations.split(',')]
+    print(f"Database: {connection.vendor} | threads={args.threads} sales/thread={args.sales} "
+          f"shards={args.shards} hold={args.hold_ms}ms")
+    if connection.vendor == 'sqlite':
+        print("⚠ SQLite serialises all writers — expect flat throughput. Use PostgreSQL for real numbers.")
+
+    locations = [
+        Location.objects.get_or_create(name=f"Benchmark Location {i + 1}")[0]
+        for i in range(max(counts))
+    ]
+    product = Product.objects.create(
+        name='Benchmark SKU', price=1, quantity=0, stock_shards=args.shards,
+    )
+    try:
+        # Enough stock everywhere that no round runs dry
+        for location in locations:
+            ledger.record_movement(product, args.threads * args.sales * len(counts), StockMovement.RESTOCK,
+                                   location=location, notes='Benchmark stock')
+
+        print()
+        print(f"{'locations':>10} {'sales':>8} {'seconds':>9} {'sales/s':>10} {'speed-up':>9} {'errors':>7}")
+        baseline = None
+        for n in counts:
+            done, elapsed, errors = run_round(product, locations[:n], args.threads, args.sales, args.hold_ms)
+            rate = done / elapsed if elapsed else 0
+            baseline = baseline or rate
+            print(f"{n:>10} {done:>8} {elapsed:>9.2f} {rate:>10.1f} {rate / baseline:>8.2f}x {errors:>7}")
+    finally:
+        product.delete()
+        Location.objects.filter(pk__in=[loc.pk for loc in locations]).delete()
+
+
+if __name__ == '__main__':
+    main()
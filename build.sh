@@ -3,6 +3,7 @@ set -o errexit
 
 pip install -r requirements.txt
 python manage.py migrate
+python manage.py createcachetable
 python manage.py collectstatic --no-input
 
 # Ye code automatically aapka Admin user aur Password bana dega
@@ -1,36 +1,194 @@
 """
 Django Admin configuration
+Sale and Product changelists are tuned for large tables: estimated counts,
+select_related rows, cached filter choices and set-based bulk stock actions.
 """
-from django.contrib import admin
-from .models import Category, Product, Sale
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.functional import cached_property
+
+from . import ledger
+from .models import Category, Location, LocationStock, Product, Sale, StockMovement, StockSnapshot
+
+
+# Below this many rows an exact COUNT(*) is cheap enough to keep
+EXACT_COUNT_LIMIT = 10000
+FILTER_CHOICES_CACHE_SECONDS = 300
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids a full COUNT(*) on unfiltered changelists.
+    Uses the planner's row estimate on PostgreSQL and MAX(id) on SQLite,
+    falling back to an exact count for small or filtered querysets.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, 'query', None)
+        if query is None or query.where:
+            return super().count
+
+        estimate = self._estimated_rows(self.object_list.model._meta.db_table)
+        if estimate is None or estimate < EXACT_COUNT_LIMIT:
+            return super().count
+        return estimate
+
+    def _estimated_rows(self, table):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            elif connection.vendor == 'sqlite':
+                cursor.execute(f'SELECT MAX(id) FROM "{table}"')
+            else:
+                return None
+            row = cursor.fetchone()
+        return int(row[0]) if row and row[0] is not None else None
+
+
+class CachedRelatedFieldListFilter(admin.RelatedFieldListFilter):
+    """Related-field filter whose choice list is cached instead of queried per page view."""
+
+    def field_choices(self, field, request, model_admin):
+        key = f"admin:filter-choices:{model_admin.model._meta.label_lower}:{self.field_path}"
+        return cache.get_or_set(
+            key,
+            lambda: list(super(CachedRelatedFieldListFilter, self).field_choices(field, request, model_admin)),
+            FILTER_CHOICES_CACHE_SECONDS,
+        )
+
+
+class StockAdjustActionForm(ActionForm):
+    quantity = forms.IntegerField(required=False, min_value=0, label='Quantity')
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ['name', 'description', 'created_at']
+    list_display = ['name', 'parent', 'description', 'created_at']
+    list_select_related = ['parent']
     search_fields = ['name']
 
 
+@admin.register(Location)
+class LocationAdmin(admin.ModelAdmin):
+    list_display = ['name', 'is_default', 'created_at']
+    search_fields = ['name']
+
+
+class LocationStockInline(admin.TabularInline):
+    model = LocationStock
+    extra = 0
+    readonly_fields = ['location', 'shard', 'quantity']
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ['name', 'category', 'price', 'quantity', 'low_stock_threshold', 'is_low_stock_display', 'created_at']
-    list_filter = ['category']
+    list_display = ['name', 'category', 'price', 'quantity', 'low_stock_threshold', 'stock_shards', 'is_low_stock_display', 'created_at']
+    list_filter = [('category', CachedRelatedFieldListFilter)]
+    list_select_related = ['category']
     search_fields = ['name']
-    list_editable = ['quantity', 'low_stock_threshold']
+    list_editable = ['low_stock_threshold']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = StockAdjustActionForm
+    actions = ['add_stock', 'remove_stock', 'set_stock']
+    inlines = [LocationStockInline]
 
     def is_low_stock_display(self, obj):
         return obj.is_low_stock
     is_low_stock_display.boolean = True
     is_low_stock_display.short_description = 'Low Stock?'
 
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            super().save_model(request, obj, form, change)
+            if not change or 'quantity' in form.changed_data:
+                ledger.log_adjustment(obj, notes='Admin edit')
+            else:
+                # Changelist and other edits write back the total they loaded; restore it
+                ledger.rollup_quantities([obj.pk])
+
+    def _action_quantity(self, request):
+        form = self.action_form(request.POST)
+        form.fields['action'].choices = self.get_action_choices(request)
+        if not form.is_valid() or form.cleaned_data.get('quantity') is None:
+            self.message_user(request, "Enter a quantity (0 or more) next to the action.", messages.ERROR)
+            return None
+        return form.cleaned_data['quantity']
+
+    def _bulk_update(self, request, queryset, quantity_expr, verb):
+        qty = self._action_quantity(request)
+        if qty is None:
+            return
+        updated = ledger.bulk_apply(
+            queryset, quantity_expr(qty), StockMovement.ADJUSTMENT, notes=f"Admin: {verb.lower()} {qty}"
+        )
+        self.message_user(request, f"{verb} {qty} units on {updated} product(s).", messages.SUCCESS)
+
+    @admin.action(description='Add quantity to selected products')
+    def add_stock(self, request, queryset):
+        self._bulk_update(request, queryset, lambda qty: F('quantity') + qty, 'Added')
+
+    @admin.action(description='Remove quantity from selected products')
+    def remove_stock(self, request, queryset):
+        self._bulk_update(request, queryset, lambda qty: Greatest(F('quantity') - qty, Value(0)), 'Removed')
+
+    @admin.action(description='Set stock of selected products to quantity')
+    def set_stock(self, request, queryset):
+        self._bulk_update(request, queryset, lambda qty: Value(qty), 'Set stock to')
+
 
 @admin.register(Sale)
 class SaleAdmin(admin.ModelAdmin):
-    list_display = ['product', 'quantity_sold', 'sale_price', 'revenue_display', 'sale_date']
-    list_filter = ['sale_date', 'product__category']
+    list_display = ['product', 'location', 'quantity_sold', 'sale_price', 'revenue_display', 'sale_date']
+    list_filter = ['sale_date', ('product__category', CachedRelatedFieldListFilter), 'location']
+    list_select_related = ['product', 'location']
     search_fields = ['product__name']
-    date_hierarchy = 'sale_date'
+    raw_id_fields = ['product']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def revenue_display(self, obj):
         return f"₹{obj.total_revenue}"
     revenue_display.short_description = 'Revenue'
+
+
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ['product', 'location', 'movement_type', 'quantity', 'sale', 'notes', 'created_at']
+    list_filter = ['movement_type', 'location', 'created_at']
+    list_select_related = ['product', 'location', 'sale__product']
+    search_fields = ['product__name']
+    raw_id_fields = ['product', 'sale']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    # Append-only: movements are written by the stock operations themselves
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(StockSnapshot)
+class StockSnapshotAdmin(admin.ModelAdmin):
+    list_display = ['product', 'quantity', 'taken_at']
+    list_filter = ['taken_at']
+    list_select_related = ['product']
+    search_fields = ['product__name']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -1,17 +1,46 @@
 """
 Data Analysis Module — uses Pandas for stock & sales analysis
 FIXED: Timezone-aware datetime comparison bug resolved.
+
+Pandas is imported inside the functions that need it, so importing this
+module (and inventory.views) stays cheap for pages that never analyse.
+Set ANALYTICS_PRELOAD=True to import it at worker boot instead.
+
+The whole-history reports (monthly, top products, dashboard totals) take a
+`streaming` flag, defaulting to ANALYTICS_STREAMING. Streaming mode folds
+sales chunk by chunk (inventory.streaming) instead of building a DataFrame.
+Fast movers and the dashboard totals also take an `approximate` flag,
+defaulting to ANALYTICS_SKETCHES, which answers them from per-day sketches
+(inventory.sketches) in constant time instead of scanning sales.
 """
-import pandas as pd
+from django.conf import settings
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
 from django.utils import timezone
 from datetime import timedelta
-from .models import Sale, Product
+from . import sketches
+from . import streaming as streaming_analysis
+from .models import Category, Sale, Product
+
+
+def _streaming(flag):
+    return settings.ANALYTICS_STREAMING if flag is None else flag
+
+
+def _approximate(flag):
+    return settings.ANALYTICS_SKETCHES if flag is None else flag
+
+
+def preload():
+    """Import the analytics stack now — used by long-lived workers (see InventoryConfig.ready)."""
+    import pandas  # noqa: F401
 
 
 def get_sales_dataframe():
     """
     Convert all Sales records to a Pandas DataFrame.
     """
+    import pandas as pd
+
     sales = Sale.objects.select_related('product__category').all()
 
     if not sales.exists():
@@ -35,10 +64,16 @@ def get_sales_dataframe():
     return df
 
 
-def get_fast_moving_products(days=30, top_n=5):
+def get_fast_moving_products(days=30, top_n=5, approximate=None):
     """
     Fast-moving = products with highest total quantity sold in last N days.
+    Approximate results carry an error_bound (see inventory.sketches).
     """
+    if _approximate(approximate):
+        return sketches.fast_moving_products(days=days, top_n=top_n)
+
+    import pandas as pd
+
     cutoff_date = timezone.now() - timedelta(days=days)
 
     sales = Sale.objects.filter(
@@ -62,10 +97,13 @@ def get_fast_moving_products(days=30, top_n=5):
     return fast_moving.to_dict('records')
 
 
-def get_monthly_sales_report():
+def get_monthly_sales_report(streaming=None):
     """
     Aggregate sales by calendar month using Pandas resample.
     """
+    if _streaming(streaming):
+        return streaming_analysis.monthly_sales_report()
+
     df = get_sales_dataframe()
 
     if df.empty:
@@ -84,23 +122,44 @@ def get_monthly_sales_report():
     return monthly[['month', 'total_revenue', 'units_sold', 'transactions']].to_dict('records')
 
 
-def get_category_sales_breakdown():
+def get_category_sales_breakdown(parent=None):
     """
-    Revenue broken down by product category.
+    Revenue and units per category, each rolled up over its whole subtree.
+    parent=None gives the top-level departments (plus 'Uncategorized');
+    a Category gives its direct children, plus its own directly assigned
+    products. One GROUP BY over the CategoryClosure join — the tree is
+    never walked in Python.
     """
-    df = get_sales_dataframe()
-
-    if df.empty:
-        return []
-
-    breakdown = (
-        df.groupby('category')
-        .agg(revenue=('revenue', 'sum'), units=('quantity_sold', 'sum'))
-        .reset_index()
-        .sort_values('revenue', ascending=False)
+    node = 'product__category__ancestor_links__ancestor'
+    totals = {
+        'revenue': Sum(ExpressionWrapper(F('quantity_sold') * F('sale_price'), output_field=DecimalField())),
+        'units': Sum('quantity_sold'),
+    }
+    rows = (
+        Sale.objects.filter(**{f'{node}__parent': parent})
+        .values(category_id=F(f'{node}__id'), category=F(f'{node}__name'))
+        .annotate(**totals)
     )
+    breakdown = [
+        {'category': r['category'], 'category_id': r['category_id'],
+         'revenue': float(r['revenue']), 'units': r['units']}
+        for r in rows
+    ]
+    # Products sitting on the parent itself rather than in one of its children
+    direct = Sale.objects.filter(product__category=parent).aggregate(**totals)
+    if direct['units']:
+        breakdown.append({
+            'category': 'Uncategorized' if parent is None else f"{parent.name} (no subcategory)",
+            'category_id': None, 'revenue': float(direct['revenue']), 'units': direct['units'],
+        })
 
-    return breakdown.to_dict('records')
+    with_children = set(
+        Category.objects.filter(parent_id__in=[r['category_id'] for r in breakdown])
+        .values_list('parent_id', flat=True)
+    )
+    for row in breakdown:
+        row['has_children'] = row['category_id'] in with_children
+    return sorted(breakdown, key=lambda r: r['revenue'], reverse=True)
 
 
 def get_low_stock_products():
@@ -124,16 +183,39 @@ def get_low_stock_products():
     return sorted(low_stock, key=lambda x: x['deficit'], reverse=True)
 
 
-def get_dashboard_stats():
+def get_dashboard_stats(streaming=None, approximate=None):
     """
     Summary statistics for the dashboard.
     FIXED: Use tz_localize instead of passing tz= to pd.Timestamp constructor.
     """
-    df = get_sales_dataframe()
     products = Product.objects.all()
 
     total_stock_value = sum(float(p.stock_value) for p in products)
 
+    if _approximate(approximate) or _streaming(streaming):
+        source = sketches if _approximate(approximate) else streaming_analysis
+        totals = source.sales_totals(days=30)
+        monthly_revenue = totals['monthly_revenue']
+        total_units_sold = totals['total_units_sold']
+        total_revenue = totals['total_revenue']
+    else:
+        monthly_revenue, total_units_sold, total_revenue = _dataframe_sales_totals()
+
+    return {
+        'total_products': products.count(),
+        'low_stock_count': sum(1 for p in products if p.is_low_stock),
+        'total_stock_value': round(total_stock_value, 2),
+        'monthly_revenue': round(monthly_revenue, 2),
+        'total_revenue': round(total_revenue, 2),
+        'total_units_sold': total_units_sold,
+    }
+
+
+def _dataframe_sales_totals():
+    """(last-30-days revenue, all-time units, all-time revenue) via Pandas."""
+    import pandas as pd
+
+    df = get_sales_dataframe()
     if not df.empty:
         # FIX: Correct way to create timezone-aware Timestamp for comparison
         cutoff_naive = timezone.now() - timedelta(days=30)
@@ -147,19 +229,14 @@ def get_dashboard_stats():
         monthly_revenue = 0
         total_units_sold = 0
         total_revenue = 0
+    return monthly_revenue, total_units_sold, total_revenue
 
-    return {
-        'total_products': products.count(),
-        'low_stock_count': sum(1 for p in products if p.is_low_stock),
-        'total_stock_value': round(total_stock_value, 2),
-        'monthly_revenue': round(monthly_revenue, 2),
-        'total_revenue': round(total_revenue, 2),
-        'total_units_sold': total_units_sold,
-    }
 
-
-def get_product_sales_chart_data():
+def get_product_sales_chart_data(streaming=None):
     """Returns top 10 products by revenue for bar chart."""
+    if _streaming(streaming):
+        return streaming_analysis.product_sales_chart_data(top_n=10)
+
     df = get_sales_dataframe()
     if df.empty:
         return []
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class InventoryConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'inventory'
+
+    def ready(self):
+        # Long-lived workers (gunicorn --preload) can pay the pandas import once
+        # at boot; serverless cold starts leave it to the first analysis request.
+        if settings.ANALYTICS_PRELOAD:
+            from . import analysis
+            analysis.preload()
+
+        # Approximate mode keeps its sketches current from Sale signals; off by
+        # default, so sales pay nothing for it unless it is used
+        if settings.ANALYTICS_SKETCHES:
+            from . import sketches
+            sketches.connect_signals()
@@ -0,0 +1,155 @@
+"""
+Report Cache — precomputed analysis results shared by every worker
+The expensive page inputs (the dashboard bundle and the category tree) are
+built once and kept in the shared cache without expiry. Views read them
+through get(). An entry is stale once it is older than
+ANALYTICS_CACHE_SECONDS or sales or stock changed after it was built
+(mark_changed(), called on commit by Sale/Product saves and deletes and by
+the ledger's set-based updates). A stale entry is still served while one
+background thread rebuilds it; pages without live updates ask for
+get(name, fresh=True) and rebuild it in the request instead.
+`python manage.py warm_cache` builds everything from start.sh, just before
+gunicorn starts, so the first visitor does not pay for a cold computation
+however long after the build the deploy goes live.
+
+The dashboard bundle holds the KPIs, tables and chart series together with
+the live-event id current when they were built, so the live stream replays
+every delta since then on top of exactly those numbers.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+from . import analysis
+from .models import Category, LiveEvent, Sale
+
+KEY_PREFIX = 'reports:'
+REFRESH_LOCK_SECONDS = 60       # one background rebuild per item across workers
+
+# part -> builder; built separately (and timed separately by warm_cache)
+DASHBOARD_PARTS = {
+    'stats': analysis.get_dashboard_stats,
+    'fast_moving': lambda: analysis.get_fast_moving_products(days=30, top_n=5),
+    'low_stock': analysis.get_low_stock_products,
+    'recent_sales': lambda: list(Sale.objects.select_related('product').order_by('-sale_date')[:10]),
+    'monthly_report': analysis.get_monthly_sales_report,
+    'category_breakdown': analysis.get_category_sales_breakdown,
+    'product_chart': analysis.get_product_sales_chart_data,
+}
+
+
+def build_dashboard(workers=1, timings=None):
+    """
+    Every DASHBOARD_PARTS value, `workers` parts at a time, plus the live
+    event id. `timings`, when given, receives {part: seconds}.
+    """
+    timings = {} if timings is None else timings
+
+    def build(part):
+        started = time.perf_counter()
+        try:
+            return DASHBOARD_PARTS[part]()
+        finally:
+            timings[part] = time.perf_counter() - started
+
+    if workers > 1:
+        def build_in_thread(part):
+            try:
+                return build(part)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            bundle = dict(zip(DASHBOARD_PARTS, pool.map(build_in_thread, DASHBOARD_PARTS)))
+    else:
+        bundle = {part: build(part) for part in DASHBOARD_PARTS}
+    # Read after computing, as the uncached dashboard did — see live.py
+    bundle['live_last_id'] = LiveEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+    return bundle
+
+
+# name -> builder; each value is cached under KEY_PREFIX + name
+ITEMS = {
+    'dashboard': build_dashboard,
+    'category_tree': Category.tree,
+}
+
+
+def get(name, fresh=False):
+    """
+    Cached value of a report item; built on a miss. When stale it is served
+    and refreshed in the background, or with fresh=True rebuilt right away.
+    """
+    key = KEY_PREFIX + name
+    found = cache.get_many([key, f'{key}:changed'])
+    entry = found.get(key)
+    if entry is None:
+        return _store(name)
+    stale = f'{key}:changed' in found or time.time() - entry['built_at'] > settings.ANALYTICS_CACHE_SECONDS
+    if stale and fresh:
+        return _store(name)
+    if stale:
+        _refresh_in_background(name)
+    return entry['value']
+
+
+def mark_changed(name='dashboard'):
+    """Sales or stock changed: `name` is stale from now on. Call from transaction.on_commit."""
+    # Read first: while a mark is pending, busy tills only SELECT it, never write one row
+    key = f'{KEY_PREFIX}{name}:changed'
+    if not cache.has_key(key):
+        cache.add(key, True, None)
+
+
+def _store(name, build=None):
+    """Build an item and store it with no expiry; returns the value."""
+    # Cleared first: a change committed while building marks it stale again
+    cache.delete(f'{KEY_PREFIX}{name}:changed')
+    value = (build or ITEMS[name])()
+    cache.set(KEY_PREFIX + name, {'value': value, 'built_at': time.time()}, None)
+    return value
+
+
+def _refresh_in_background(name):
+    # cache.add is atomic, so only one worker process rebuilds a stale item
+    if not cache.add(f'{KEY_PREFIX}{name}:refreshing', True, REFRESH_LOCK_SECONDS):
+        return
+
+    def refresh():
+        try:
+            _store(name)
+        finally:
+            cache.delete(f'{KEY_PREFIX}{name}:refreshing')
+            connection.close()
+
+    threading.Thread(target=refresh, name=f'refresh-{name}', daemon=True).start()
+
+
+def invalidate(*names):
+    cache.delete_many([KEY_PREFIX + name for name in names])
+
+
+def warm(names=None, workers=4):
+    """
+    Rebuild and store the given items (default: all); the dashboard's parts
+    are built `workers` at a time. Returns [(name, seconds, error)], with the
+    dashboard reported per part as dashboard.<part>.
+    """
+    results = []
+    for name in names or ITEMS:
+        started = time.perf_counter()
+        timings = {}
+        try:
+            if name == 'dashboard':
+                _store(name, lambda: build_dashboard(workers, timings))
+                results += [(f'{name}.{part}', seconds, None) for part, seconds in timings.items()]
+            else:
+                _store(name)
+                results.append((name, time.perf_counter() - started, None))
+        except Exception as exc:  # report and carry on with the other items
+            results.append((name, time.perf_counter() - started, exc))
+    return results
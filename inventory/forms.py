@@ -1,20 +1,32 @@
 """
 Django Forms for Inventory System
-Handles: Category, Product, Sale, Stock Update, Date Filter
+Handles: Category, Product, Sale, Stock Update, Restock Import, Date Filter, Stock As-Of,
+          Replenishment Simulation
 """
 from django import forms
-from .models import Category, Product, Sale
+from .ledger import location_stock
+from .models import Category, Location, Product, Sale
+
+
+def tree_choices(empty_label):
+    """Category choices in tree order, subcategories indented under their parent."""
+    return [('', empty_label)] + [(c.pk, c.tree_label) for c in Category.tree()]
 
 
 class CategoryForm(forms.ModelForm):
     class Meta:
         model = Category
-        fields = ['name', 'description']
+        fields = ['name', 'parent', 'description']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Category name'}),
+            'parent': forms.Select(attrs={'class': 'form-select'}),
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['parent'].choices = tree_choices('None (top-level department)')
+
 
 class ProductForm(forms.ModelForm):
     class Meta:
@@ -30,6 +42,10 @@ class ProductForm(forms.ModelForm):
             'description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['category'].choices = tree_choices('---------')
+
     def clean_price(self):
         price = self.cleaned_data.get('price')
         if price <= 0:
@@ -46,30 +62,45 @@ class ProductForm(forms.ModelForm):
 class SaleForm(forms.ModelForm):
     class Meta:
         model = Sale
-        fields = ['product', 'quantity_sold', 'sale_price', 'notes']
+        fields = ['product', 'location', 'quantity_sold', 'sale_price', 'notes']
         widgets = {
             'product': forms.Select(attrs={'class': 'form-select', 'id': 'id_product'}),
+            'location': forms.Select(attrs={'class': 'form-select', 'id': 'id_location'}),
             'quantity_sold': forms.NumberInput(attrs={'class': 'form-control', 'min': 1}),
             'sale_price': forms.NumberInput(attrs={'class': 'form-control', 'step': '0.01', 'id': 'id_sale_price'}),
             'notes': forms.Textarea(attrs={'class': 'form-control', 'rows': 2}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['location'].required = True
+        self.fields['location'].empty_label = None
+        self.fields['location'].initial = Location.objects.filter(is_default=True).first()
+
     def clean(self):
         cleaned_data = super().clean()
         product = cleaned_data.get('product')
+        location = cleaned_data.get('location')
         quantity_sold = cleaned_data.get('quantity_sold')
 
-        if product and quantity_sold:
+        if product and location and quantity_sold:
             if quantity_sold <= 0:
                 raise forms.ValidationError("Quantity sold must be at least 1.")
-            if quantity_sold > product.quantity:
+            available = location_stock(product, location)
+            if quantity_sold > available:
                 raise forms.ValidationError(
-                    f"Insufficient stock! Only {product.quantity} units available for '{product.name}'."
+                    f"Insufficient stock! Only {available} units available for '{product.name}' at {location.name}."
                 )
         return cleaned_data
 
 
 class StockUpdateForm(forms.Form):
+    location = forms.ModelChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        empty_label="Default location",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
     quantity_to_add = forms.IntegerField(
         label="Quantity to Add",
         min_value=1,
@@ -84,6 +115,25 @@ class StockUpdateForm(forms.Form):
     )
 
 
+class RestockImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label="Supplier CSV",
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,text/csv'})
+    )
+    location = forms.ModelChoiceField(
+        queryset=Location.objects.all(),
+        required=False,
+        empty_label="Default location",
+        help_text="Used for lines without a location column.",
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    skip_invalid = forms.BooleanField(
+        required=False,
+        label="Apply valid lines even if some lines have errors",
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+
 class DateFilterForm(forms.Form):
     start_date = forms.DateField(
         required=False,
@@ -93,3 +143,38 @@ class DateFilterForm(forms.Form):
         required=False,
         widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'})
     )
+
+
+class StockAsOfForm(forms.Form):
+    as_of = forms.DateField(
+        widget=forms.DateInput(attrs={'class': 'form-control form-control-sm', 'type': 'date'})
+    )
+
+
+class SimulationForm(forms.Form):
+    lead_time_days = forms.IntegerField(
+        label="Lead time (days)", min_value=0, max_value=90, initial=7,
+        widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'})
+    )
+    policy = forms.ChoiceField(
+        choices=[('sQ', 'Fixed order quantity (s, Q)'), ('sS', 'Order up to level (s, S)')],
+        initial='sQ',
+        widget=forms.Select(attrs={'class': 'form-select form-select-sm'})
+    )
+    order_days = forms.IntegerField(
+        label="Order covers (days of demand)", min_value=1, max_value=180, initial=14,
+        widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'})
+    )
+    horizon_days = forms.IntegerField(
+        label="Horizon (days)", min_value=1, max_value=180, initial=30,
+        widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'})
+    )
+    # Runs inside the request: SKUs × paths × horizon bounds its cost
+    skus = forms.IntegerField(
+        label="SKUs (lowest cover first)", min_value=1, max_value=2000, initial=500,
+        widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'})
+    )
+    paths = forms.IntegerField(
+        label="Paths per SKU", min_value=10, max_value=500, initial=200,
+        widget=forms.NumberInput(attrs={'class': 'form-control form-control-sm'})
+    )
@@ -0,0 +1,172 @@
+"""
+Goods Receipt Import — bulk restock from a supplier CSV
+Lines are parsed and validated one at a time and folded into per
+(product, location) totals, so memory grows with the catalogue, not the file.
+All increments are then applied set-based inside one transaction.
+
+Expected columns (header row required, case-insensitive):
+    product_id  or  product   — product id, or an exact, unique product name
+    quantity    (or qty)      — units received, a positive whole number
+    location    (optional)    — store/warehouse name; default location if blank
+"""
+import csv
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count
+
+from . import ledger, live
+from .models import Location, LocationStock, Product, StockMovement
+
+APPLY_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+
+def import_restock_csv(stream, notes='', skip_invalid=False, default_location=None,
+                       max_errors=MAX_REPORTED_ERRORS):
+    """
+    Validate and apply a restock CSV read from a text stream.
+    With errors and skip_invalid=False nothing is applied.
+    Returns a result dict: lines, products, units, applied, error_count and
+    errors — a list of (line_number, message), capped at max_errors.
+    """
+    result = {'lines': 0, 'products': 0, 'units': 0, 'applied': False, 'error_count': 0, 'errors': []}
+
+    def report(line_no, message):
+        result['error_count'] += 1
+        if len(result['errors']) < max_errors:
+            result['errors'].append((line_no, message))
+
+    increments = parse_restock_rows(csv.reader(stream), report, default_location, result)
+    if not increments or (result['error_count'] and not skip_invalid):
+        return result
+
+    apply_restock(increments, notes)
+    result['products'] = len({product_id for product_id, _ in increments})
+    result['units'] = sum(increments.values())
+    result['applied'] = True
+    return result
+
+
+def parse_restock_rows(rows, report, default_location, result):
+    """
+    Fold CSV rows into {(product_id, location_id): units}.
+    Lookup tables are loaded once, so each line is validated with dict lookups.
+    """
+    header = next(rows, None)
+    if header is None:
+        report(1, "File is empty.")
+        return {}
+    columns = {name.strip().lower(): i for i, name in enumerate(header)}
+    product_col = columns.get('product_id', columns.get('product'))
+    by_id = 'product_id' in columns
+    qty_col = columns.get('quantity', columns.get('qty'))
+    location_col = columns.get('location')
+    if product_col is None or qty_col is None:
+        report(1, "Header must include 'product_id' (or 'product') and 'quantity' columns.")
+        return {}
+
+    if by_id:
+        products = set(Product.objects.values_list('pk', flat=True))
+        ambiguous = set()
+    else:
+        products = dict(Product.objects.values_list('name', 'pk'))
+        ambiguous = set(
+            Product.objects.values('name').annotate(n=Count('pk')).filter(n__gt=1).values_list('name', flat=True)
+        )
+    locations = {name.lower(): pk for name, pk in Location.objects.values_list('name', 'pk')}
+    default_location_id = (default_location or Location.get_default()).pk
+
+    increments = defaultdict(int)
+    for line_no, row in enumerate(rows, start=2):
+        if not any(cell.strip() for cell in row):
+            continue
+        result['lines'] += 1
+        try:
+            product_ref = row[product_col].strip()
+            qty_text = row[qty_col].strip()
+            location_name = row[location_col].strip() if location_col is not None else ''
+        except IndexError:
+            report(line_no, f"Expected {len(header)} columns, got {len(row)}.")
+            continue
+
+        if by_id:
+            product_id = int(product_ref) if product_ref.isdigit() else None
+            if product_id not in products:
+                report(line_no, f"Unknown product id '{product_ref}'.")
+                continue
+        else:
+            if product_ref in ambiguous:
+                report(line_no, f"Product name '{product_ref}' is not unique — use product_id.")
+                continue
+            product_id = products.get(product_ref)
+            if product_id is None:
+                report(line_no, f"Unknown product '{product_ref}'.")
+                continue
+
+        try:
+            qty = int(qty_text)
+        except ValueError:
+            report(line_no, f"Quantity '{qty_text}' is not a whole number.")
+            continue
+        if qty <= 0:
+            report(line_no, "Quantity must be at least 1.")
+            continue
+
+        if location_name:
+            location_id = locations.get(location_name.lower())
+            if location_id is None:
+                report(line_no, f"Unknown location '{location_name}'.")
+                continue
+        else:
+            location_id = default_location_id
+
+        increments[(product_id, location_id)] += qty
+    return increments
+
+
+def apply_restock(increments, notes=''):
+    """
+    Apply {(product_id, location_id): units} in one transaction: locked bulk
+    update of shard-0 counters, bulk insert of missing counters and ledger
+    movements, then a set-based rollup of the product totals.
+    """
+    items = sorted(increments.items())
+    product_ids = sorted({product_id for (product_id, _), _ in items})
+    with transaction.atomic():
+        before = {}
+        for start in range(0, len(product_ids), APPLY_CHUNK_SIZE):
+            chunk = product_ids[start:start + APPLY_CHUNK_SIZE]
+            before.update(
+                (pk, (qty, threshold))
+                for pk, qty, threshold in Product.objects.filter(pk__in=chunk)
+                .values_list('pk', 'quantity', 'low_stock_threshold')
+            )
+
+        for start in range(0, len(items), APPLY_CHUNK_SIZE):
+            chunk = dict(items[start:start + APPLY_CHUNK_SIZE])
+            counters = list(
+                LocationStock.objects.select_for_update()
+                .filter(product_id__in={p for p, _ in chunk}, shard=0)
+            )
+            counters = [c for c in counters if (c.product_id, c.location_id) in chunk]
+            for counter in counters:
+                counter.quantity += chunk[(counter.product_id, counter.location_id)]
+            LocationStock.objects.bulk_update(counters, ['quantity'], batch_size=APPLY_CHUNK_SIZE)
+
+            existing = {(c.product_id, c.location_id) for c in counters}
+            LocationStock.objects.bulk_create([
+                LocationStock(product_id=product_id, location_id=location_id, shard=0, quantity=qty)
+                for (product_id, location_id), qty in chunk.items()
+                if (product_id, location_id) not in existing
+            ])
+            StockMovement.objects.bulk_create([
+                StockMovement(product_id=product_id, location_id=location_id,
+                              movement_type=StockMovement.RESTOCK, quantity=qty, notes=notes[:255])
+                for (product_id, location_id), qty in chunk.items()
+            ])
+
+        for start in range(0, len(product_ids), APPLY_CHUNK_SIZE):
+            ledger.rollup_quantities(product_ids[start:start + APPLY_CHUNK_SIZE])
+
+        transaction.on_commit(lambda: live.publish_restock_batch(before), robust=True)
@@ -0,0 +1,254 @@
+"""
+Stock Ledger — every stock change updates one per-location counter
+(LocationStock) and is appended as a StockMovement.
+Product.quantity is the maintained total across locations and stays the O(1)
+current-stock read; the ledger plus periodic StockSnapshots answer
+"what was on hand at time T?".
+"""
+import random
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Location, LocationStock, Product, StockMovement, StockSnapshot
+
+# Lower bound for products that have no snapshot yet
+LEDGER_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+# created_at is stamped before commit, so a movement can become visible after
+# later ones; snapshots default to this far in the past, past any open write
+SNAPSHOT_SAFETY_MARGIN = timedelta(minutes=5)
+
+
+def record_movement(product, quantity, movement_type, location=None, sale=None, notes=''):
+    """
+    Apply a signed quantity change at one location and append it to the ledger.
+    Only that location's counter row is written (a random shard for hot
+    products). The product total is refreshed right after commit, or by
+    `rollup_stock` for sharded products, so sales never queue on the Product row.
+    """
+    location = location or Location.get_default()
+    shard = random.randrange(product.stock_shards)
+    with transaction.atomic():
+        _apply_to_counter(product.pk, location.pk, shard, quantity)
+        movement = StockMovement.objects.create(
+            product=product,
+            location=location,
+            movement_type=movement_type,
+            quantity=quantity,
+            sale=sale,
+            notes=notes,
+        )
+        if not product.is_sharded:
+            transaction.on_commit(lambda: rollup_quantities([product.pk]))
+    product.quantity += quantity
+    return movement
+
+
+def _apply_to_counter(product_id, location_id, shard, quantity):
+    counter = LocationStock.objects.filter(product_id=product_id, location_id=location_id, shard=shard)
+    if not counter.update(quantity=F('quantity') + quantity):
+        LocationStock.objects.get_or_create(product_id=product_id, location_id=location_id, shard=shard)
+        counter.update(quantity=F('quantity') + quantity)
+
+
+def log_adjustment(product, notes=''):
+    """
+    Record a quantity the user set and that was already saved on the product
+    (product forms, admin edits). The difference from the counters' actual
+    total is booked against the default location. Only call it for new
+    products or when the quantity field was edited: otherwise the saved
+    total of a sharded product can lag sales not rolled up yet, and booking
+    it would undo them (use rollup_quantities instead). Returns None when
+    nothing changed.
+    """
+    location = Location.get_default()
+    with transaction.atomic():
+        delta = product.quantity - _locked_totals([product.pk])[product.pk]
+        if delta == 0:
+            return None
+        _apply_to_counter(product.pk, location.pk, 0, delta)
+        return StockMovement.objects.create(
+            product=product,
+            location=location,
+            movement_type=StockMovement.ADJUSTMENT,
+            quantity=delta,
+            notes=notes,
+        )
+
+
+def bulk_apply(queryset, quantity_expr, movement_type, notes=''):
+    """
+    Set-based stock change for many products: one UPDATE on the totals,
+    one bulk update of the default-location counters and one bulk INSERT
+    into the ledger. Totals are first rolled up from the locked counters,
+    so quantity_expr and the booked deltas start from the actual stock of
+    sharded products too. Returns the number of products updated.
+    """
+    location = Location.get_default()
+    with transaction.atomic():
+        locked = Product.objects.select_for_update().filter(pk__in=queryset.values('pk'))
+        before = _locked_totals(list(locked.values_list('pk', flat=True)))
+        rollup_quantities(before)
+        updated = Product.objects.filter(pk__in=before).update(
+            quantity=quantity_expr,
+            updated_at=timezone.now(),
+        )
+        after = Product.objects.filter(pk__in=before).values_list('pk', 'quantity')
+        deltas = {pk: qty - before[pk] for pk, qty in after if qty != before[pk]}
+
+        counters = list(LocationStock.objects.filter(product_id__in=deltas, location=location, shard=0))
+        for counter in counters:
+            counter.quantity += deltas[counter.product_id]
+        LocationStock.objects.bulk_update(counters, ['quantity'], batch_size=1000)
+        existing = {counter.product_id for counter in counters}
+        LocationStock.objects.bulk_create(
+            [
+                LocationStock(product_id=pk, location=location, shard=0, quantity=delta)
+                for pk, delta in deltas.items()
+                if pk not in existing
+            ],
+            batch_size=1000,
+        )
+
+        StockMovement.objects.bulk_create(
+            [
+                StockMovement(product_id=pk, location=location, movement_type=movement_type,
+                              quantity=delta, notes=notes)
+                for pk, delta in deltas.items()
+            ],
+            batch_size=1000,
+        )
+        transaction.on_commit(_mark_reports_changed)
+    return updated
+
+
+def _locked_totals(product_ids):
+    """counter_totals() with the counter rows locked, so sales to any shard wait for the caller's commit."""
+    list(LocationStock.objects.select_for_update().filter(product_id__in=product_ids).values_list('pk', flat=True))
+    return counter_totals(product_ids)
+
+
+def location_stock(product, location):
+    """Units of `product` on hand at `location` (sum of its counter shards)."""
+    return LocationStock.objects.filter(product=product, location=location).aggregate(
+        total=Coalesce(Sum('quantity'), 0)
+    )['total']
+
+
+def counter_totals(product_ids):
+    """Sum of all location counters per product — {product_id: quantity}."""
+    rows = (
+        LocationStock.objects
+        .filter(product_id__in=product_ids)
+        .values('product_id')
+        .annotate(total=Sum('quantity'))
+        .values_list('product_id', 'total')
+    )
+    totals = dict.fromkeys(product_ids, 0)
+    totals.update(rows)
+    return totals
+
+
+def rollup_quantities(product_ids):
+    """
+    Refresh the maintained Product.quantity aggregate from the location
+    counters with a single UPDATE. Returns the number of products updated.
+    """
+    totals = (
+        LocationStock.objects
+        .filter(product=OuterRef('pk'))
+        .order_by()
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+    updated = Product.objects.filter(pk__in=product_ids).update(
+        quantity=Coalesce(Subquery(totals, output_field=IntegerField()), Value(0))
+    )
+    transaction.on_commit(_mark_reports_changed)
+    return updated
+
+
+def _mark_reports_changed():
+    from .caching import mark_changed  # lazy: caching pulls in the analysis modules
+    mark_changed()
+
+
+def ledger_balances(product_ids, at=None):
+    """
+    Ledger stock for the given products at time `at` (default: now).
+    One query: latest snapshot at or before `at`, plus the sum of movements
+    recorded after that snapshot — a bounded range on (product, created_at).
+    Returns {product_id: quantity}.
+    """
+    at = at or timezone.now()
+    latest = StockSnapshot.objects.filter(
+        product=OuterRef('pk'), taken_at__lte=at
+    ).order_by('-taken_at')
+
+    moved_after = (
+        StockMovement.objects
+        .filter(
+            product=OuterRef('pk'),
+            created_at__gt=Coalesce(OuterRef('snapshot_at'), Value(LEDGER_EPOCH)),
+            created_at__lte=at,
+        )
+        .order_by()
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total')
+    )
+
+    rows = (
+        Product.objects
+        .filter(pk__in=product_ids)
+        .annotate(
+            snapshot_at=Subquery(latest.values('taken_at')[:1]),
+            snapshot_qty=Coalesce(Subquery(latest.values('quantity')[:1]), Value(0)),
+        )
+        .annotate(moved_after=Coalesce(Subquery(moved_after, output_field=IntegerField()), Value(0)))
+        .values_list('pk', 'snapshot_qty', 'moved_after')
+    )
+    return {pk: snapshot_qty + moved for pk, snapshot_qty, moved in rows}
+
+
+def stock_at(product, at):
+    """Units of `product` on hand at datetime `at`."""
+    return ledger_balances([product.pk], at).get(product.pk, 0)
+
+
+def take_snapshots(chunk_size=1000, at=None):
+    """
+    Store a ledger-derived snapshot for every product, `chunk_size` products
+    at a time. `at` defaults to now - SNAPSHOT_SAFETY_MARGIN, so movements
+    still uncommitted at snapshot time fall after it and are counted later.
+    Returns the number of snapshots written.
+    """
+    at = at or timezone.now() - SNAPSHOT_SAFETY_MARGIN
+    written = 0
+    for ids in iter_product_id_chunks(chunk_size):
+        balances = ledger_balances(ids, at)
+        StockSnapshot.objects.bulk_create(
+            [StockSnapshot(product_id=pk, quantity=qty, taken_at=at) for pk, qty in balances.items()]
+        )
+        written += len(balances)
+    return written
+
+
+def iter_product_id_chunks(chunk_size, queryset=None):
+    """Yield lists of product ids in primary-key order using keyset pagination."""
+    queryset = Product.objects.all() if queryset is None else queryset
+    last_pk = 0
+    while True:
+        ids = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', flat=True)[:chunk_size]
+        )
+        if not ids:
+            return
+        yield ids
+        last_pk = ids[-1]
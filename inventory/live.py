@@ -0,0 +1,304 @@
+"""
+Live Dashboard Updates — Server-Sent Events
+Sales and restocks publish small deltas (new sale, KPI changes, fast-mover
+rank changes, low-stock transitions) as LiveEvent rows once they commit.
+Each worker process runs one EventBroker thread that polls for new rows and
+fans them out to every connected dashboard, so N open dashboards cost one
+indexed query per poll interval per process instead of N full recomputes.
+Each open stream does hold one server thread, though: size gunicorn's
+workers × threads for the dashboards left open plus normal traffic (README,
+"Live Dashboard").
+"""
+import json
+import threading
+import time
+from collections import deque
+from datetime import timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.db import close_old_connections, connection
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import CategoryClosure, LiveEvent, Product, Sale
+
+POLL_INTERVAL = 1.0             # seconds between broker polls
+HEARTBEAT_INTERVAL = 15         # seconds between SSE keep-alive comments
+STREAM_LIFETIME = 300           # seconds before a stream ends and the client reconnects
+EVENT_RETENTION = timedelta(hours=6)
+GAP_GRACE = 5.0                 # seconds a missing event id may still commit before polls move past it
+FAST_MOVERS_KEY = 'live:fast-movers'
+FAST_MOVERS_TTL = 300           # full recompute at least this often (30-day window drift)
+FAST_MOVERS_DAYS = 30
+FAST_MOVERS_TOP_N = 5
+
+
+# ============================================================
+# PUBLISHING
+# ============================================================
+
+def publish_sale(sale, product, was_low_stock):
+    """Publish deltas for a committed sale. Call from transaction.on_commit."""
+    revenue = float(sale.total_revenue)
+    category = _department_name(product.category_id)
+    events = [
+        ('sale', {
+            'product_id': product.pk,
+            'product': product.name,
+            'category': category,
+            'quantity': sale.quantity_sold,
+            'revenue': revenue,
+            'month': sale.sale_date.astimezone(dt_timezone.utc).strftime('%b %Y'),
+            'date': timezone.localtime(sale.sale_date).strftime('%d %b'),
+        }),
+        ('kpi', {
+            'total_revenue': revenue,
+            'monthly_revenue': revenue,
+            'total_units_sold': sale.quantity_sold,
+            'total_stock_value': -float(product.price) * sale.quantity_sold,
+        }),
+    ]
+    events += _low_stock_events(product, was_low_stock)
+
+    ranking = _update_fast_movers(product, sale.quantity_sold)
+    if ranking is not None:
+        events.append(('fast_movers', {'items': ranking}))
+
+    LiveEvent.objects.bulk_create([LiveEvent(kind=kind, payload=payload) for kind, payload in events])
+
+
+def publish_restock(product, quantity, was_low_stock):
+    """Publish deltas for a committed restock. Call from transaction.on_commit."""
+    events = [('kpi', {'total_stock_value': float(product.price) * quantity})]
+    events += _low_stock_events(product, was_low_stock)
+    LiveEvent.objects.bulk_create([LiveEvent(kind=kind, payload=payload) for kind, payload in events])
+
+
+def publish_restock_batch(before, chunk_size=1000):
+    """
+    Publish deltas for a committed bulk restock.
+    `before` maps product_id -> (quantity, low_stock_threshold) prior to the import.
+    """
+    stock_value = 0.0
+    events = []
+    product_ids = sorted(before)
+    for start in range(0, len(product_ids), chunk_size):
+        rows = Product.objects.filter(pk__in=product_ids[start:start + chunk_size]).values_list(
+            'pk', 'name', 'price', 'quantity', 'low_stock_threshold')
+        for pk, name, price, quantity, threshold in rows:
+            old_quantity, old_threshold = before[pk]
+            stock_value += float(price) * (quantity - old_quantity)
+            was_low, is_low = old_quantity <= old_threshold, quantity <= threshold
+            if was_low != is_low:
+                events.append(('low_stock', {
+                    'product_id': pk, 'name': name, 'quantity': quantity,
+                    'threshold': threshold, 'low': is_low,
+                }))
+                events.append(('kpi', {'low_stock_count': 1 if is_low else -1}))
+    events.insert(0, ('kpi', {'total_stock_value': stock_value}))
+    LiveEvent.objects.bulk_create([LiveEvent(kind=kind, payload=payload) for kind, payload in events],
+                                  batch_size=chunk_size)
+
+
+def _department_name(category_id):
+    """Top-level ancestor's name — the key the dashboard's department pie uses."""
+    if category_id is None:
+        return 'Uncategorized'
+    return (
+        CategoryClosure.objects.filter(descendant_id=category_id)
+        .order_by('-depth').values_list('ancestor__name', flat=True).first()
+    )
+
+
+def _low_stock_events(product, was_low_stock):
+    if product.is_low_stock == was_low_stock:
+        return []
+    return [
+        ('low_stock', {
+            'product_id': product.pk,
+            'name': product.name,
+            'quantity': product.quantity,
+            'threshold': product.low_stock_threshold,
+            'low': product.is_low_stock,
+        }),
+        ('kpi', {'low_stock_count': 1 if product.is_low_stock else -1}),
+    ]
+
+
+def _fast_movers_from_db():
+    cutoff = timezone.now() - timedelta(days=FAST_MOVERS_DAYS)
+    rows = (
+        Sale.objects.filter(sale_date__gte=cutoff)
+        .values('product_id', 'product__name')
+        .annotate(quantity_sold=Sum('quantity_sold'))
+        .order_by('-quantity_sold')[:FAST_MOVERS_TOP_N]
+    )
+    return [
+        {'product_id': r['product_id'], 'product': r['product__name'], 'quantity_sold': r['quantity_sold']}
+        for r in rows
+    ]
+
+
+def _update_fast_movers(product, quantity):
+    """
+    Maintain the cached top-N incrementally. Only a product outside the
+    cached ranking needs a (single-product) query; the whole ranking is
+    recomputed every FAST_MOVERS_TTL seconds as old sales leave the window.
+    Returns the new ranking when the order changed, else None.
+    """
+    cached = cache.get(FAST_MOVERS_KEY)
+    if cached is None or time.time() - cached['computed_at'] > FAST_MOVERS_TTL:
+        ranking = _fast_movers_from_db()
+        cache.set(FAST_MOVERS_KEY, {'computed_at': time.time(), 'items': ranking}, None)
+        if cached is not None and _order(ranking) == _order(cached['items']):
+            return None
+        return ranking
+
+    ranking = cached['items']
+    order_before = _order(ranking)
+    entry = next((item for item in ranking if item['product_id'] == product.pk), None)
+    if entry is not None:
+        entry['quantity_sold'] += quantity
+    else:
+        cutoff = timezone.now() - timedelta(days=FAST_MOVERS_DAYS)
+        total = Sale.objects.filter(product=product, sale_date__gte=cutoff).aggregate(
+            total=Sum('quantity_sold'))['total'] or 0
+        ranking.append({'product_id': product.pk, 'product': product.name, 'quantity_sold': total})
+
+    ranking = sorted(ranking, key=lambda item: item['quantity_sold'], reverse=True)[:FAST_MOVERS_TOP_N]
+    cache.set(FAST_MOVERS_KEY, {'computed_at': cached['computed_at'], 'items': ranking}, None)
+    return None if _order(ranking) == order_before else ranking
+
+
+def _order(ranking):
+    return [item['product_id'] for item in ranking]
+
+
+# ============================================================
+# DISTRIBUTION
+# ============================================================
+
+class EventBroker:
+    """
+    Per-process fan-out. A single daemon thread polls LiveEvent while at
+    least one stream is listening and wakes all listeners on new rows.
+    """
+
+    def __init__(self, interval=POLL_INTERVAL, buffer_size=1000):
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._buffer = deque(maxlen=buffer_size)
+        self._head = None
+        self._gap_since = None
+        self._listeners = 0
+        self._thread = None
+
+    def head(self):
+        """Id of the newest event seen — new streams start after it."""
+        with self._cond:
+            if self._head is None:
+                self._head = LiveEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            return self._head
+
+    def subscribe(self):
+        with self._cond:
+            self._listeners += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._poll, name='live-event-broker', daemon=True)
+                self._thread.start()
+
+    def unsubscribe(self):
+        with self._cond:
+            self._listeners -= 1
+
+    def wait(self, last_id, timeout):
+        """Events newer than last_id, blocking up to `timeout` seconds for one."""
+        with self._cond:
+            behind = (
+                self._head is not None and self._head > last_id
+                and (not self._buffer or self._buffer[0][0] > last_id + 1)
+            )
+        if behind:
+            # Client fell behind the in-memory buffer — read the gap directly,
+            # up to the head so ids still waiting on a gap aren't skipped
+            return [event for event in _events_after(last_id) if event[0] <= self._head]
+        with self._cond:
+            self._cond.wait_for(lambda: self._head is not None and self._head > last_id, timeout)
+            return [event for event in self._buffer if event[0] > last_id]
+
+    def _poll(self):
+        last_prune = 0
+        try:
+            while True:
+                with self._cond:
+                    if self._listeners <= 0:
+                        self._thread = None
+                        return
+                    after = self._head if self._head is not None else 0
+                events = self._in_order(after, _events_after(after))
+                if events:
+                    with self._cond:
+                        self._buffer.extend(events)
+                        self._head = events[-1][0]
+                        self._cond.notify_all()
+                if time.monotonic() - last_prune > 600:
+                    LiveEvent.objects.filter(created_at__lt=timezone.now() - EVENT_RETENTION).delete()
+                    last_prune = time.monotonic()
+                time.sleep(self.interval)
+        finally:
+            connection.close()
+
+    def _in_order(self, after, events):
+        """
+        The leading events with no missing id before them. Ids are assigned
+        before commit (PostgreSQL sequences), so a gap can be a transaction
+        still committing; moving the head past it would skip that event for
+        good. Later events are held back (and re-read next poll) until the
+        gap fills or has been open GAP_GRACE seconds — then it is taken as a
+        rollback.
+        """
+        ready = []
+        expected = after + 1
+        for event in events:
+            if event[0] != expected:
+                if self._gap_since is None:
+                    self._gap_since = time.monotonic()
+                if time.monotonic() - self._gap_since < GAP_GRACE:
+                    break
+            self._gap_since = None
+            ready.append(event)
+            expected = event[0] + 1
+        return ready
+
+
+def _events_after(last_id, limit=500):
+    rows = LiveEvent.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'kind', 'payload')[:limit]
+    return [(pk, kind, json.dumps(payload)) for pk, kind, payload in rows]
+
+
+broker = EventBroker()
+
+
+def event_stream(last_id=None):
+    """
+    SSE body generator. Ends after STREAM_LIFETIME so sync workers recycle;
+    EventSource reconnects with Last-Event-ID and resumes without gaps.
+    """
+    close_old_connections()
+    head = broker.head()
+    if last_id is None:
+        last_id = head
+    broker.subscribe()
+    try:
+        yield "retry: 3000\n: connected\n\n"
+        deadline = time.monotonic() + STREAM_LIFETIME
+        while time.monotonic() < deadline:
+            events = broker.wait(last_id, HEARTBEAT_INTERVAL)
+            if not events:
+                yield ": keep-alive\n\n"
+                continue
+            for pk, kind, data in events:
+                yield f"id: {pk}\nevent: {kind}\ndata: {data}\n\n"
+                last_id = pk
+    finally:
+        broker.unsubscribe()
@@ -0,0 +1,57 @@
+"""
+Goods receipt from a supplier CSV (see inventory/imports.py for the format):
+
+    python manage.py import_restock delivery.csv
+    python manage.py import_restock delivery.csv --skip-invalid --location "Main Store"
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import imports
+from inventory.models import Location
+
+
+class Command(BaseCommand):
+    help = "Validate a restock CSV and apply all quantity increments in one transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV file to import.')
+        parser.add_argument('--location', help='Location name for lines without a location column.')
+        parser.add_argument('--skip-invalid', action='store_true',
+                            help='Apply valid lines even if some lines have errors.')
+        parser.add_argument('--max-errors', type=int, default=imports.MAX_REPORTED_ERRORS,
+                            help='Errors listed in the report (all are counted).')
+
+    def handle(self, *args, **options):
+        location = None
+        if options['location']:
+            try:
+                location = Location.objects.get(name=options['location'])
+            except Location.DoesNotExist:
+                raise CommandError(f"Unknown location '{options['location']}'.")
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', errors='replace', newline='') as f:
+                result = imports.import_restock_csv(
+                    f,
+                    notes=f"CSV import: {options['path']}",
+                    skip_invalid=options['skip_invalid'],
+                    default_location=location,
+                    max_errors=options['max_errors'],
+                )
+        except OSError as exc:
+            raise CommandError(str(exc))
+
+        for line_no, message in result['errors']:
+            self.stderr.write(f"line {line_no}: {message}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... and {result['error_count'] - len(result['errors'])} more errors")
+
+        if result['applied']:
+            self.stdout.write(self.style.SUCCESS(
+                f"✓ {result['units']} units restocked across {result['products']} products "
+                f"({result['lines']} lines, {result['error_count']} skipped)"
+            ))
+        elif result['error_count']:
+            raise CommandError(f"Nothing imported — {result['error_count']} line(s) have errors.")
+        else:
+            self.stdout.write(self.style.WARNING("No restock lines found."))
@@ -0,0 +1,34 @@
+"""
+Recompute the per-day sales sketches (inventory/sketches.py) from the Sale table.
+Run once when turning on ANALYTICS_SKETCHES, and after bulk_create()/update()
+on Sale, which skip the signals that keep the sketches current:
+
+    python manage.py rebuild_sketches
+
+While ANALYTICS_SKETCHES is on, sales saved, edited or deleted anywhere else
+(views, admin, cascades) keep the sketches current on their own.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Sum
+from django.db.models.functions import Length
+
+from inventory import sketches
+from inventory.models import SalesSketch
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-day sales sketches used by the approximate analytics mode."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        days = sketches.rebuild()
+        sketches.window()  # fill in the running totals now rather than on the first query
+        elapsed = time.perf_counter() - started
+
+        size = SalesSketch.objects.aggregate(
+            size=Sum(Length('counts')) + Sum(Length('cumulative_counts')))['size'] or 0
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {days} days of sales sketched in {elapsed:.2f}s ({size / 1024:.0f} KB of sketches)"
+        ))
@@ -0,0 +1,66 @@
+"""
+Check stock counters against the stock ledger, a chunk of products at a time:
+
+    python manage.py reconcile_stock
+    python manage.py reconcile_stock --fix    # append correcting adjustments, refresh totals
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from inventory import ledger
+from inventory.models import Product, StockMovement
+
+
+class Command(BaseCommand):
+    help = "Compare location stock counters and Product.quantity with the stock ledger."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Products processed per query (default: 1000).')
+        parser.add_argument('--fix', action='store_true',
+                            help='Append adjustment movements so the ledger matches the counters, '
+                                 'and refresh stale Product.quantity totals.')
+
+    def handle(self, *args, **options):
+        checked = 0
+        mismatched = 0
+        stale_totals = 0
+
+        for ids in ledger.iter_product_id_chunks(options['chunk_size']):
+            with transaction.atomic():
+                balances = ledger.ledger_balances(ids)
+                counters = ledger.counter_totals(ids)
+                current = Product.objects.filter(pk__in=ids).values_list('pk', 'name', 'quantity')
+
+                corrections = []
+                stale = []
+                for pk, name, quantity in current:
+                    on_hand = counters[pk]
+                    expected = balances.get(pk, 0)
+                    if on_hand != expected:
+                        mismatched += 1
+                        self.stdout.write(self.style.WARNING(
+                            f"✗ {name} (#{pk}): counters={on_hand}, ledger={expected}, diff={on_hand - expected:+d}"
+                        ))
+                        corrections.append(StockMovement(
+                            product_id=pk,
+                            movement_type=StockMovement.ADJUSTMENT,
+                            quantity=on_hand - expected,
+                            notes='Reconciliation',
+                        ))
+                    if quantity != on_hand:
+                        stale.append(pk)
+
+                if options['fix']:
+                    if corrections:
+                        StockMovement.objects.bulk_create(corrections)
+                    if stale:
+                        ledger.rollup_quantities(stale)
+            stale_totals += len(stale)
+            checked += len(ids)
+
+        summary = f"{checked} products checked, {mismatched} mismatched, {stale_totals} stale totals"
+        if (mismatched or stale_totals) and options['fix']:
+            summary += " (fixed)"
+        style = self.style.SUCCESS if not mismatched else self.style.WARNING
+        self.stdout.write(style(summary))
@@ -0,0 +1,28 @@
+"""
+Refresh Product.quantity from the per-location stock counters.
+Sharded (hot) products are only rolled up here, so schedule it frequently:
+
+    python manage.py rollup_stock          # sharded products only
+    python manage.py rollup_stock --all    # every product
+"""
+from django.core.management.base import BaseCommand
+
+from inventory import ledger
+from inventory.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recompute the maintained Product.quantity totals from location counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true',
+                            help='Roll up every product, not just sharded ones.')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Products updated per query (default: 1000).')
+
+    def handle(self, *args, **options):
+        products = Product.objects.all() if options['all'] else Product.objects.filter(stock_shards__gt=1)
+        updated = 0
+        for ids in ledger.iter_product_id_chunks(options['chunk_size'], products):
+            updated += ledger.rollup_quantities(ids)
+        self.stdout.write(self.style.SUCCESS(f"✓ {updated} product totals refreshed"))
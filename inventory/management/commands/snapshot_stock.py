@@ -0,0 +1,21 @@
+"""
+Take a per-product stock snapshot from the ledger.
+Schedule it (e.g. nightly cron) so point-in-time queries stay bounded:
+
+    python manage.py snapshot_stock
+"""
+from django.core.management.base import BaseCommand
+
+from inventory import ledger
+
+
+class Command(BaseCommand):
+    help = "Store a ledger-derived stock snapshot for every product."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Products processed per query (default: 1000).')
+
+    def handle(self, *args, **options):
+        written = ledger.take_snapshots(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"✓ {written} stock snapshots written"))
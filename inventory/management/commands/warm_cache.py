@@ -0,0 +1,48 @@
+"""
+Precompute the shared report cache after a deploy, before traffic arrives:
+
+    python manage.py warm_cache                       # every item
+    python manage.py warm_cache --only dashboard --workers 1
+
+The dashboard's parts are built in parallel; each part's build time is
+printed so the expensive ones stand out.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from inventory import caching
+
+
+class Command(BaseCommand):
+    help = "Build and store the dashboard (KPIs, charts, analysis report) and category tree caches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', default='',
+                            help=f"Comma-separated items (default: all of {', '.join(caching.ITEMS)}).")
+        parser.add_argument('--workers', type=int, default=4,
+                            help='Dashboard parts built at once (default: 4).')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['only'].split(',') if name.strip()]
+        unknown = set(names) - set(caching.ITEMS)
+        if unknown:
+            raise CommandError(f"Unknown item(s): {', '.join(sorted(unknown))}")
+
+        started = time.perf_counter()
+        results = caching.warm(names, workers=options['workers'])
+        elapsed = time.perf_counter() - started
+
+        failed = 0
+        for name, seconds, error in sorted(results, key=lambda r: r[1], reverse=True):
+            if error is None:
+                self.stdout.write(f"  {name:<30} {seconds:>7.2f}s")
+            else:
+                failed += 1
+                self.stdout.write(self.style.ERROR(f"  {name:<30} {seconds:>7.2f}s  {error}"))
+
+        total = sum(seconds for _, seconds, _ in results)
+        summary = f"{len(results) - failed}/{len(results)} parts warmed in {elapsed:.2f}s ({total:.2f}s of work)"
+        if failed:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(f"✓ {summary}"))
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def move_stock_to_default_location(apps, schema_editor):
+    """Existing stock (and ledger history) belongs to a default 'Main Store'."""
+    Location = apps.get_model('inventory', 'Location')
+    Product = apps.get_model('inventory', 'Product')
+    LocationStock = apps.get_model('inventory', 'LocationStock')
+    StockMovement = apps.get_model('inventory', 'StockMovement')
+
+    main, _ = Location.objects.get_or_create(name='Main Store', defaults={'is_default': True})
+    LocationStock.objects.bulk_create(
+        [
+            LocationStock(product_id=pk, location=main, shard=0, quantity=qty)
+            for pk, qty in Product.objects.values_list('pk', 'quantity').iterator()
+        ],
+        batch_size=1000,
+    )
+    StockMovement.objects.filter(location__isnull=True).update(location=main)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0002_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Location',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('is_default', models.BooleanField(default=False, help_text="Receives stock changes that don't name a location (product forms, admin actions).")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='stock_shards',
+            field=models.PositiveSmallIntegerField(default=1, help_text="Counter rows per location. Raise for best-sellers so concurrent sales don't queue on one row."),
+        ),
+        migrations.CreateModel(
+            name='LocationStock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0)),
+                ('location', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stocks', to='inventory.location')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='location_stocks', to='inventory.product')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='sale',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='sales', to='inventory.location'),
+        ),
+        migrations.AddField(
+            model_name='stockmovement',
+            name='location',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movements', to='inventory.location'),
+        ),
+        migrations.AddConstraint(
+            model_name='locationstock',
+            constraint=models.UniqueConstraint(fields=('product', 'location', 'shard'), name='unique_location_stock_shard'),
+        ),
+        migrations.RunPython(move_stock_to_default_location, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:31
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def seed_closure(apps, schema_editor):
+    """Existing categories are all top-level: each is only its own ancestor."""
+    Category = apps.get_model('inventory', 'Category')
+    CategoryClosure = apps.get_model('inventory', 'CategoryClosure')
+    CategoryClosure.objects.bulk_create(
+        [CategoryClosure(ancestor_id=pk, descendant_id=pk, depth=0) for pk in Category.objects.values_list('pk', flat=True)],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_request_profile'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='parent',
+            field=models.ForeignKey(blank=True, help_text='Leave empty for a top-level department.', null=True, on_delete=django.db.models.deletion.RESTRICT, related_name='children', to='inventory.category'),
+        ),
+        migrations.CreateModel(
+            name='CategoryClosure',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveSmallIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='descendant_links', to='inventory.category')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ancestor_links', to='inventory.category')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['descendant', 'ancestor'], name='inventory_c_descend_701fe6_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='categoryclosure',
+            constraint=models.UniqueConstraint(fields=('ancestor', 'descendant'), name='unique_category_closure'),
+        ),
+        migrations.RunPython(seed_closure, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-19 01:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0006_category_tree'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('units', models.BigIntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('transactions', models.BigIntegerField(default=0)),
+                ('counts', models.BinaryField()),
+                ('cumulative_units', models.BigIntegerField(null=True)),
+                ('cumulative_revenue', models.DecimalField(decimal_places=2, max_digits=18, null=True)),
+                ('cumulative_transactions', models.BigIntegerField(null=True)),
+                ('cumulative_counts', models.BinaryField(null=True)),
+            ],
+            options={
+                'ordering': ['day'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:00
+
+import django.core.validators
+from django.db import migrations, models
+
+
+def raise_zero_shards(apps, schema_editor):
+    """0 shards made every sale fail; such products get the single default counter."""
+    Product = apps.get_model('inventory', 'Product')
+    Product.objects.filter(stock_shards=0).update(stock_shards=1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0007_sales_sketch'),
+    ]
+
+    operations = [
+        migrations.RunPython(raise_zero_shards, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='product',
+            name='stock_shards',
+            field=models.PositiveSmallIntegerField(default=1, help_text="Counter rows per location. Raise for best-sellers so concurrent sales don't queue on one row.", validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+        migrations.AddConstraint(
+            model_name='product',
+            constraint=models.CheckConstraint(check=models.Q(('stock_shards__gte', 1)), name='product_stock_shards_gte_1'),
+        ),
+    ]
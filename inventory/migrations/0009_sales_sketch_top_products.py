@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:02
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+TOP_K = 32  # inventory.sketches.TOP_K
+
+
+def fill_top_products(apps, schema_editor):
+    """Each existing day's best sellers by exact units, so fast movers work without a rebuild."""
+    Sale = apps.get_model('inventory', 'Sale')
+    SalesSketch = apps.get_model('inventory', 'SalesSketch')
+    units = defaultdict(list)
+    rows = (
+        Sale.objects.annotate(day=TruncDate('sale_date')).values('day', 'product_id')
+        .annotate(units=Sum('quantity_sold')).values_list('day', 'product_id', 'units').order_by()
+    )
+    for day, product_id, sold in rows:
+        units[day].append((sold, product_id))
+    for sketch in SalesSketch.objects.all():
+        best = sorted(units.get(sketch.day, ()), key=lambda row: (-row[0], row[1]))[:TOP_K]
+        sketch.top_products = [product_id for _, product_id in best]
+        sketch.save(update_fields=['top_products'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0008_product_stock_shards_min'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salessketch',
+            name='top_products',
+            field=models.JSONField(default=list),
+        ),
+        migrations.RunPython(fill_top_products, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 02:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0009_sales_sketch_top_products'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesSketchDelta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('product_id', models.BigIntegerField()),
+                ('quantity', models.IntegerField()),
+                ('revenue', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('transactions', models.SmallIntegerField()),
+            ],
+        ),
+    ]
@@ -1,14 +1,33 @@
 """
 Database models for Inventory & Stock Analysis System
-Defines: Category, Product, Sale
+Defines: Category, CategoryClosure, Location, Product, LocationStock, Sale, StockMovement,
+StockSnapshot, LiveEvent, RequestProfile
 """
-from django.db import models
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.core.validators import MinValueValidator
+from django.db import models, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils import timezone
 
 
 class Category(models.Model):
-    """Product category (e.g., Electronics, Clothing, Food)"""
+    """
+    Product category (e.g., Electronics, Clothing, Food).
+    Categories nest: department -> category -> subcategory. save() keeps
+    CategoryClosure in step, so subtree queries are a single join.
+    """
     name = models.CharField(max_length=100, unique=True)
+    parent = models.ForeignKey(
+        'self',
+        on_delete=models.RESTRICT,
+        null=True,
+        blank=True,
+        related_name='children',
+        help_text="Leave empty for a top-level department."
+    )
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -19,6 +38,123 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+    def clean(self):
+        if self.pk and self.parent_id and self.is_ancestor_of(self.parent_id):
+            raise ValidationError({'parent': "A category cannot be moved under itself or its own subcategory."})
+
+    def is_ancestor_of(self, category_id):
+        return CategoryClosure.objects.filter(ancestor_id=self.pk, descendant_id=category_id).exists()
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            created = self._state.adding
+            old_parent_id = None
+            if not created:
+                old_parent_id = Category.objects.filter(pk=self.pk).values_list('parent_id', flat=True).first()
+                if self.parent_id != old_parent_id and self.parent_id and self.is_ancestor_of(self.parent_id):
+                    raise ValueError(f"Cannot move '{self.name}' under its own subtree.")
+            super().save(*args, **kwargs)
+
+            if created:
+                CategoryClosure.objects.create(ancestor=self, descendant=self, depth=0)
+                self._attach_subtree([(self.pk, 0)])
+            elif self.parent_id != old_parent_id:
+                subtree = list(CategoryClosure.objects.filter(ancestor=self).values_list('descendant_id', 'depth'))
+                subtree_ids = [pk for pk, _ in subtree]
+                CategoryClosure.objects.filter(descendant_id__in=subtree_ids).exclude(
+                    ancestor_id__in=subtree_ids).delete()
+                self._attach_subtree(subtree)
+            transaction.on_commit(_invalidate_category_tree)
+
+    def delete(self, *args, **kwargs):
+        transaction.on_commit(_invalidate_category_tree)
+        return super().delete(*args, **kwargs)
+
+    def _attach_subtree(self, subtree):
+        """Link every (descendant, depth) of this node to each ancestor of the new parent."""
+        if self.parent_id is None:
+            return
+        ancestors = CategoryClosure.objects.filter(descendant_id=self.parent_id).values_list('ancestor_id', 'depth')
+        CategoryClosure.objects.bulk_create([
+            CategoryClosure(ancestor_id=ancestor_id, descendant_id=descendant_id, depth=up + down + 1)
+            for ancestor_id, up in ancestors
+            for descendant_id, down in subtree
+        ])
+
+    def ancestors(self):
+        """Root-first path to this category, itself included."""
+        return Category.objects.filter(descendant_links__descendant=self).order_by('-descendant_links__depth')
+
+    @classmethod
+    def tree(cls):
+        """
+        All categories depth-first, siblings by name, each annotated with
+        `depth` and an indented `tree_label` — for selects and listings.
+        """
+        children = defaultdict(list)
+        for category in cls.objects.all():
+            children[category.parent_id].append(category)
+
+        ordered = []
+        stack = [(category, 0) for category in reversed(children[None])]
+        while stack:
+            category, depth = stack.pop()
+            category.depth = depth
+            category.tree_label = f"{'— ' * depth}{category.name}"
+            ordered.append(category)
+            stack.extend((child, depth + 1) for child in reversed(children[category.pk]))
+        return ordered
+
+
+def _invalidate_category_tree():
+    from .caching import invalidate  # caching imports this module
+    # The dashboard bundle's category breakdown is keyed by category name too
+    invalidate('category_tree', 'dashboard')
+
+
+class CategoryClosure(models.Model):
+    """
+    Transitive closure of the category tree: one row per (ancestor,
+    descendant) pair, each category paired with itself at depth 0.
+    Written only by Category.save(); rows go with their category on delete.
+    """
+    ancestor = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='descendant_links')
+    descendant = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='ancestor_links')
+    depth = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['ancestor', 'descendant'], name='unique_category_closure'),
+        ]
+        indexes = [models.Index(fields=['descendant', 'ancestor'])]
+
+    def __str__(self):
+        return f"{self.ancestor_id} -> {self.descendant_id} ({self.depth})"
+
+
+class Location(models.Model):
+    """Store or warehouse that holds stock"""
+    name = models.CharField(max_length=100, unique=True)
+    is_default = models.BooleanField(
+        default=False,
+        help_text="Receives stock changes that don't name a location (product forms, admin actions)."
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def get_default(cls):
+        """Returns the default location, creating 'Main Store' if none exists"""
+        location = cls.objects.filter(is_default=True).order_by('pk').first()
+        if location is None:
+            location, _ = cls.objects.get_or_create(name='Main Store', defaults={'is_default': True})
+        return location
+
 
 class Product(models.Model):
     """Product model — stores item details and current stock"""
@@ -31,18 +167,33 @@ class Product(models.Model):
     )
     price = models.DecimalField(max_digits=10, decimal_places=2)
     cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    # Total across all LocationStock rows — maintained by inventory.ledger
     quantity = models.IntegerField(default=0)
     low_stock_threshold = models.IntegerField(default=10)
+    stock_shards = models.PositiveSmallIntegerField(
+        default=1,
+        validators=[MinValueValidator(1)],
+        help_text="Counter rows per location. Raise for best-sellers so concurrent sales don't queue on one row."
+    )
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['name']
+        constraints = [
+            # ledger.record_movement picks a shard with randrange(stock_shards)
+            models.CheckConstraint(check=models.Q(stock_shards__gte=1), name='product_stock_shards_gte_1'),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def is_sharded(self):
+        """Sharded (hot) products have their total refreshed by `rollup_stock`, not per sale"""
+        return self.stock_shards > 1
+
     @property
     def is_low_stock(self):
         """Returns True if stock is at or below threshold"""
@@ -59,6 +210,34 @@ class Product(models.Model):
         return sum(sale.quantity_sold for sale in self.sales.all())
 
 
+class LocationStock(models.Model):
+    """
+    Stock counter for one product at one location.
+    Hot products keep several shard rows per location; the location's stock
+    is the sum of its shards.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='location_stocks'
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.CASCADE,
+        related_name='stocks'
+    )
+    shard = models.PositiveSmallIntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'location', 'shard'], name='unique_location_stock_shard'),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} @ {self.location.name} [{self.shard}]: {self.quantity}"
+
+
 class Sale(models.Model):
     """
     Sales record — each entry represents one sale transaction.
@@ -69,6 +248,13 @@ class Sale(models.Model):
         on_delete=models.CASCADE,
         related_name='sales'
     )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='sales'
+    )
     quantity_sold = models.IntegerField()
     sale_price = models.DecimalField(max_digits=10, decimal_places=2)
     sale_date = models.DateTimeField(default=timezone.now)
@@ -84,3 +270,165 @@ class Sale(models.Model):
     def total_revenue(self):
         """Revenue from this single sale"""
         return self.sale_price * self.quantity_sold
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Sale)
+def _sales_or_stock_changed(sender, **kwargs):
+    transaction.on_commit(_mark_reports_changed)
+
+
+def _mark_reports_changed():
+    from .caching import mark_changed  # caching imports this module
+    mark_changed()
+
+
+class StockMovement(models.Model):
+    """
+    Append-only stock ledger — one row per change to Product.quantity.
+    Positive quantity adds stock, negative removes it.
+    """
+    SALE = 'sale'
+    RESTOCK = 'restock'
+    ADJUSTMENT = 'adjustment'
+    MOVEMENT_TYPES = [
+        (SALE, 'Sale'),
+        (RESTOCK, 'Restock'),
+        (ADJUSTMENT, 'Adjustment'),
+    ]
+
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='movements'
+    )
+    location = models.ForeignKey(
+        Location,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movements'
+    )
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    quantity = models.IntegerField()
+    sale = models.ForeignKey(
+        Sale,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movements'
+    )
+    notes = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['product', 'created_at'])]
+
+    def __str__(self):
+        return f"{self.product.name}: {self.quantity:+d} ({self.get_movement_type_display()})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Periodic per-product stock level, taken by `manage.py snapshot_stock`.
+    Point-in-time stock = latest snapshot + movements recorded after it.
+    """
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name='snapshots'
+    )
+    quantity = models.IntegerField()
+    taken_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-taken_at']
+        indexes = [models.Index(fields=['product', 'taken_at'])]
+
+    def __str__(self):
+        return f"{self.product.name}: {self.quantity} units at {self.taken_at.strftime('%d-%m-%Y %H:%M')}"
+
+
+class LiveEvent(models.Model):
+    """
+    Dashboard delta pushed to live clients over Server-Sent Events.
+    Written after a sale or restock commits; the id is the SSE event id.
+    """
+    kind = models.CharField(max_length=30)
+    payload = models.JSONField()
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind}"
+
+
+class RequestProfile(models.Model):
+    """
+    One request captured by the staff on-demand profiler (inventory.profiling).
+    Holds the SQL issued with its origin in app code, a cProfile dump and
+    sampled call stacks in collapsed (flamegraph.pl / speedscope) format.
+    """
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    user = models.ForeignKey('auth.User', on_delete=models.SET_NULL, null=True, blank=True)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    query_ms = models.FloatField()
+    queries = models.JSONField(default=list)
+    pstats = models.BinaryField()
+    folded_stacks = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f} ms)"
+
+
+class SalesSketch(models.Model):
+    """
+    One local day of sales in compact form (inventory.sketches): a zlib-packed
+    Count-Min sketch of units per product plus exact units, revenue and
+    transaction count, and the day's TOP_K best-selling product ids (the
+    fast-mover candidates). Closed days also carry cumulative_* totals of every
+    day up to and including them; cumulative_counts is NULL until (re)computed.
+    """
+    day = models.DateField(unique=True)
+    units = models.BigIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    transactions = models.BigIntegerField(default=0)
+    counts = models.BinaryField()
+    top_products = models.JSONField(default=list)
+    cumulative_units = models.BigIntegerField(null=True)
+    cumulative_revenue = models.DecimalField(max_digits=18, decimal_places=2, null=True)
+    cumulative_transactions = models.BigIntegerField(null=True)
+    cumulative_counts = models.BinaryField(null=True)
+
+    class Meta:
+        ordering = ['day']
+
+    def __str__(self):
+        return f"{self.day}: {self.units} units, {self.transactions} sales"
+
+
+class SalesSketchDelta(models.Model):
+    """
+    A sale change not yet folded into its day's SalesSketch. The Sale signal
+    handlers append one per save (and a negated one for an edit's old figures
+    or a deletion), so checkouts only INSERT; inventory.sketches.fold() adds
+    them to the day rows and deletes them before each query.
+    """
+    day = models.DateField()
+    product_id = models.BigIntegerField()
+    quantity = models.IntegerField()
+    revenue = models.DecimalField(max_digits=14, decimal_places=2)
+    transactions = models.SmallIntegerField()
+
+    def __str__(self):
+        return f"{self.day}: product {self.product_id} {self.quantity:+d}"
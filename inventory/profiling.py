@@ -0,0 +1,179 @@
+"""
+On-demand Request Profiler — staff only
+Add ?_profile=1 to a URL, or send an X-Profile header, while logged in as
+staff and that one request runs under cProfile with a stack sampler beside
+it. Every SQL query is recorded with the inventory.* frames that issued it.
+The result is saved as a RequestProfile and the response carries its id in
+X-Profile-Id; /profiles/ lists them with .prof and collapsed-stack downloads.
+
+Requests without the trigger only pay a dict lookup, and with
+REQUEST_PROFILER=False the middleware is not installed at all. Streaming
+responses are profiled up to the point the view returns.
+"""
+import cProfile
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from .models import RequestProfile
+
+PROFILE_PARAM = '_profile'
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+ORIGIN_PACKAGE = 'inventory.'
+SAMPLE_INTERVAL = 0.005         # seconds between stack samples
+MAX_QUERIES = 2000              # queries stored per profile (all are counted)
+MAX_SQL_LENGTH = 4000
+PROFILES_KEPT = 50
+
+# cProfile cannot run in two threads of a process at once
+_profile_lock = threading.Lock()
+
+
+class ProfilerMiddleware:
+    """Profiles a single request when a staff user asks for it."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_PROFILER', True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if PROFILE_HEADER not in request.META and PROFILE_PARAM not in request.GET:
+            return self.get_response(request)
+        if not request.user.is_staff or not _profile_lock.acquire(blocking=False):
+            return self.get_response(request)
+        try:
+            return self._profile(request)
+        finally:
+            _profile_lock.release()
+
+    def _profile(self, request):
+        recorder = QueryRecorder()
+        sampler = StackSampler(threading.get_ident())
+        profiler = cProfile.Profile()
+
+        wrappers = [conn.execute_wrapper(recorder) for conn in connections.all()]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        sampler.start()
+        started = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            duration = time.perf_counter() - started
+            sampler.stop()
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+
+        profiler.create_stats()
+        profile = RequestProfile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:255],
+            user=request.user,
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            query_count=recorder.count,
+            query_ms=recorder.total * 1000,
+            queries=recorder.queries,
+            pstats=marshal.dumps(profiler.stats),
+            folded_stacks=sampler.folded(),
+        )
+        stale = RequestProfile.objects.values_list('pk', flat=True)[PROFILES_KEPT:]
+        RequestProfile.objects.filter(pk__in=list(stale)).delete()
+        response['X-Profile-Id'] = str(profile.pk)
+        return response
+
+
+class QueryRecorder:
+    """connection.execute_wrapper that times each query and notes its origin."""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.total = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.total += elapsed
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    'sql': sql[:MAX_SQL_LENGTH],
+                    'ms': round(elapsed * 1000, 3),
+                    'many': many,
+                    'origin': app_frames(sys._getframe(1)),
+                })
+
+
+def app_frames(frame):
+    """inventory.* frames on the stack, innermost first, as 'module:line function'."""
+    frames = []
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith(ORIGIN_PACKAGE) and module != __name__:
+            frames.append(f"{module}:{frame.f_lineno} {frame.f_code.co_name}")
+        frame = frame.f_back
+    return frames
+
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(name='request-profiler-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+    def folded(self):
+        """Collapsed stacks, one 'root;...;leaf count' line each (flamegraph.pl input)."""
+        return ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def summarize_queries(queries):
+    """Group recorded queries by the innermost app frame: (origin, count, total ms), slowest first."""
+    totals = {}
+    for query in queries:
+        origin = query['origin'][0] if query['origin'] else '(outside inventory)'
+        count, ms = totals.get(origin, (0, 0.0))
+        totals[origin] = (count + 1, ms + query['ms'])
+    return sorted(((origin, count, ms) for origin, (count, ms) in totals.items()),
+                  key=lambda row: row[2], reverse=True)
+
+
+def top_functions(pstats_data, limit=25):
+    """Functions with the most cumulative time from a stored cProfile dump."""
+    stats = marshal.loads(bytes(pstats_data))
+    rows = [
+        {'function': f"{filename}:{line}({name})", 'calls': calls,
+         'own_ms': own * 1000, 'cumulative_ms': cumulative * 1000}
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.items()
+    ]
+    return sorted(rows, key=lambda row: row['cumulative_ms'], reverse=True)[:limit]
@@ -0,0 +1,126 @@
+"""
+Row Builders — precomputed table rows for the long list pages
+The product list and sales history render every row. Rather than hand the
+template model instances (one object, several property calls, {% url %}
+tags, date filters and an if/elif chain per row), the views build plain
+dicts here from a single values() query: URLs are formatted from one
+reverse() per page, low stock and stock value are worked out once, amounts
+and dates are formatted up front (the date once per day), and each
+category's pill is rendered once per page and reused, styled after its
+department (top-level category) so subcategories keep their colours.
+"""
+from django.conf import settings
+from django.db.models import F
+from django.urls import reverse
+from django.utils import dateformat, formats, timezone
+from django.utils.html import format_html
+from django.utils.text import Truncator
+
+from .models import CategoryClosure
+
+# Department name -> (pill class, Bootstrap icon); other departments get the plain pill
+CATEGORY_PILLS = {
+    'Electronics': ('cat-electronics', 'bi-lightning-charge-fill'),
+    'Clothing': ('cat-clothing', 'bi-bag-fill'),
+    'Food & Beverages': ('cat-food', 'bi-cup-hot-fill'),
+    'Stationery': ('cat-stationery', 'bi-pencil-fill'),
+    'Home Appliances': ('cat-home', 'bi-house-fill'),
+}
+EMPTY_CELL = '—'
+URL_PK_PLACEHOLDER = 987654321
+
+
+def pk_url(name):
+    """reverse() once for a <int:pk> route; returns a str.format pattern for any pk."""
+    return reverse(name, args=[URL_PK_PLACEHOLDER]).replace(str(URL_PK_PLACEHOLDER), '{}')
+
+
+def amount_formatter():
+    """
+    Formats Decimals as {{ value }} would, resolving the locale's separator
+    once instead of per value.
+    """
+    if settings.USE_THOUSAND_SEPARATOR:
+        return formats.localize
+    separator = formats.get_format('DECIMAL_SEPARATOR')
+    return lambda value: f'{value:f}'.replace('.', separator)
+
+
+def department_names(category_ids):
+    """{category_id: name of its top-level ancestor} in one query."""
+    links = (CategoryClosure.objects
+             .filter(descendant_id__in=category_ids)
+             .order_by('descendant_id', 'depth')
+             .values_list('descendant_id', 'ancestor__name'))
+    # Deepest ancestor last, so it is the one kept
+    return dict(links)
+
+
+def category_pill(name, department=None):
+    """Pill showing `name`, coloured after `department` (default: `name` itself)."""
+    if name is None:
+        return format_html('<span class="cat-pill cat-default">{}</span>', EMPTY_CELL)
+    css, icon = CATEGORY_PILLS.get(department or name, ('cat-default', None))
+    if icon is None:
+        return format_html('<span class="cat-pill {}">{}</span>', css, name)
+    return format_html('<span class="cat-pill {}"><i class="bi {}"></i>{}</span>', css, icon, name)
+
+
+def low_stock_only(products):
+    """Products at or below their threshold, filtered in the database."""
+    return products.filter(quantity__lte=F('low_stock_threshold'))
+
+
+def product_rows(products):
+    """Rows for products/list.html from a Product queryset."""
+    detail, stock, edit, delete = (pk_url(name) for name in
+                                   ('product_detail', 'stock_update', 'product_edit', 'product_delete'))
+    amount = amount_formatter()
+    return [
+        {
+            'name': name,
+            'category': category,
+            'price': amount(price),
+            'quantity': quantity,
+            'low_stock': quantity <= threshold,
+            'stock_value': amount(price * quantity),
+            'detail_url': detail.format(pk),
+            'stock_url': stock.format(pk),
+            'edit_url': edit.format(pk),
+            'delete_url': delete.format(pk),
+        }
+        for pk, name, category, price, quantity, threshold in products.values_list(
+            'pk', 'name', 'category__name', 'price', 'quantity', 'low_stock_threshold')
+    ]
+
+
+def sale_rows(sales):
+    """Rows for sales/history.html from a Sale queryset, and their total revenue."""
+    amount = amount_formatter()
+    values = list(sales.values_list('product__name', 'product__category_id', 'product__category__name',
+                                    'quantity_sold', 'sale_price', 'sale_date', 'notes'))
+    departments = department_names({row[1] for row in values if row[1] is not None})
+    pills = {}
+    dates = {}
+    rows = []
+    total_revenue = 0
+    for name, category_id, category, quantity, price, sale_date, notes in values:
+        if category_id not in pills:
+            pills[category_id] = category_pill(category, departments.get(category_id))
+        local = timezone.localtime(sale_date)
+        day = local.date()
+        if day not in dates:
+            dates[day] = dateformat.format(local, 'd M Y')
+        revenue = price * quantity
+        total_revenue += revenue
+        rows.append({
+            'product': name,
+            'category_pill': pills[category_id],
+            'quantity': quantity,
+            'price': amount(price),
+            'revenue': amount(revenue),
+            'date': dates[day],
+            'time': f'{local:%H:%M}',
+            'notes': Truncator(notes).chars(25) if notes else EMPTY_CELL,
+        })
+    return rows, total_revenue
@@ -0,0 +1,200 @@
+"""
+Replenishment Simulator — Monte Carlo what-if for every SKU
+Daily demand is bootstrapped from each product's own recent sales history
+(zero-sale days included) into a SKU × path × day array, then stock is
+stepped forward one day at a time for all SKUs and paths at once:
+
+    arrivals land → demand is served (shortfall is lost) → holding cost
+    accrues on what is left → if stock + on order <= reorder point, order
+
+Policies (reorder point = the product's low_stock_threshold):
+    sQ   order a fixed Q = order_days × mean daily demand
+    sS   order up to S = reorder point + order_days × mean daily demand
+Orders arrive after lead_time_days. Holding cost is cost_price ×
+holding_rate / 365 per unit per day.
+
+SKUs are split into chunks sized to a memory budget and simulated in a
+process pool; workers receive plain NumPy arrays, never ORM objects.
+NumPy is imported inside the functions, as pandas is in inventory.analysis.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import Product, Sale
+
+POLICIES = ('sQ', 'sS')
+CHUNK_BUDGET_MB = 256           # per worker, for the demand array and its sample indices
+BYTES_PER_CELL = 16             # int32 demand + int32 indices + intp copy made by take_along_axis
+
+
+def run(lead_time_days=7, policy='sQ', order_days=14, horizon_days=30, paths=1000,
+        lookback_days=90, holding_rate=0.25, seed=None, workers=1, queryset=None):
+    """
+    Simulate every product in `queryset` (default: all) and return one dict
+    per SKU with stockout_probability, expected_lost_units,
+    expected_holding_cost, expected_orders and mean_daily_demand.
+    """
+    import numpy as np
+
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy '{policy}' (expected one of {', '.join(POLICIES)})")
+
+    products = list(
+        (queryset if queryset is not None else Product.objects.all())
+        .order_by('pk').values_list('pk', 'name', 'quantity', 'low_stock_threshold', 'cost_price')
+    )
+    if not products:
+        return []
+    ids = np.array([p[0] for p in products])
+    history = demand_history(ids, lookback_days)
+    mean_demand = history.mean(axis=1)
+    parts = simulate(
+        history,
+        on_hand=np.array([max(p[2], 0) for p in products], dtype=np.int32),
+        reorder_point=np.array([p[3] for p in products], dtype=np.int32),
+        cost_price=np.array([float(p[4]) for p in products]),
+        lead_time_days=lead_time_days, policy=policy, order_days=order_days, horizon_days=horizon_days,
+        paths=paths, holding_rate=holding_rate, seed=seed, workers=workers,
+    )
+
+    return [
+        {
+            'product_id': pk,
+            'name': name,
+            'quantity': quantity,
+            'reorder_point': threshold,
+            'mean_daily_demand': float(mean_demand[i]),
+            'stockout_probability': float(parts['stockout'][i]),
+            'expected_lost_units': float(parts['lost'][i]),
+            'expected_holding_cost': float(parts['holding_cost'][i]),
+            'expected_orders': float(parts['orders'][i]),
+        }
+        for i, (pk, name, quantity, threshold, _) in enumerate(products)
+    ]
+
+
+def simulate(history, on_hand, reorder_point, cost_price, lead_time_days=7, policy='sQ', order_days=14,
+             horizon_days=30, paths=1000, holding_rate=0.25, seed=None, workers=1):
+    """
+    Array-level simulation: one row per SKU in every input, `history` being
+    SKU × day units sold. Returns a dict of per-SKU arrays (stockout, lost,
+    holding_cost, orders), each averaged over paths.
+    """
+    import numpy as np
+
+    count = len(history)
+    order_size = np.maximum(1, np.ceil(history.mean(axis=1) * order_days)).astype(np.int32)
+    daily_cost = cost_price * holding_rate / 365
+    params = {'lead_time': lead_time_days, 'policy': policy, 'horizon': horizon_days, 'paths': paths}
+
+    chunk = max(1, int(CHUNK_BUDGET_MB * 1024 * 1024 // (BYTES_PER_CELL * paths * horizon_days)))
+    bounds = [(start, min(start + chunk, count)) for start in range(0, count, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(bounds))
+    jobs = [
+        (history[a:b], on_hand[a:b], reorder_point[a:b], order_size[a:b], daily_cost[a:b], params, child)
+        for (a, b), child in zip(bounds, seeds)
+    ]
+
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_simulate_chunk, jobs))
+    else:
+        parts = [_simulate_chunk(job) for job in jobs]
+    return {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+
+def demand_history(product_ids, lookback_days):
+    """SKU × day matrix of units sold over the last `lookback_days` days (zeros where nothing sold)."""
+    import numpy as np
+
+    today = timezone.localdate()
+    start = today - timedelta(days=lookback_days)
+    history = np.zeros((len(product_ids), lookback_days), dtype=np.int32)
+    row_of = {pk: row for row, pk in enumerate(product_ids.tolist())}
+    daily = (
+        Sale.objects.filter(sale_date__date__gte=start, sale_date__date__lt=today)
+        .annotate(day=TruncDate('sale_date'))
+        .values_list('product_id', 'day')
+        .annotate(units=Sum('quantity_sold'))
+        .order_by()
+    )
+    for product_id, day, units in daily:
+        row = row_of.get(product_id)
+        if row is not None:
+            history[row, (day - start).days] += units
+    return history
+
+
+def _simulate_chunk(job):
+    """Simulate one block of SKUs; runs in a pool worker. Returns per-SKU means over paths."""
+    import numpy as np
+
+    history, on_hand, reorder_point, order_size, daily_cost, params, seed = job
+    rng = np.random.default_rng(seed)
+    n, lookback = history.shape
+    paths, horizon, lead_time = params['paths'], params['horizon'], params['lead_time']
+
+    # SKU × path × day demand, bootstrapped from each SKU's own history
+    picks = rng.integers(0, lookback, size=(n, paths, horizon), dtype=np.int32)
+    demand = np.take_along_axis(history[:, None, :], picks.reshape(n, 1, -1), axis=2).reshape(n, paths, horizon)
+    del picks
+
+    stock = np.repeat(on_hand[:, None], paths, axis=1)
+    on_order = np.zeros_like(stock)
+    arrivals = np.zeros((lead_time + 1, n, paths), dtype=np.int32)   # ring buffer by arrival day
+    stocked_out = np.zeros((n, paths), dtype=bool)
+    lost = np.zeros((n, paths), dtype=np.int64)
+    held = np.zeros((n, paths), dtype=np.int64)
+    orders = np.zeros((n, paths), dtype=np.int32)
+    s = reorder_point[:, None]
+    q = order_size[:, None]
+
+    for day in range(horizon):
+        slot = day % (lead_time + 1)
+        stock += arrivals[slot]
+        on_order -= arrivals[slot]
+        arrivals[slot] = 0
+
+        today = demand[:, :, day]
+        sold = np.minimum(stock, today)
+        short = today - sold
+        stocked_out |= short > 0
+        lost += short
+        stock -= sold
+        held += stock
+
+        position = stock + on_order
+        reorder = position <= s
+        if params['policy'] == 'sQ':
+            quantity = np.where(reorder, q, 0)
+        else:
+            quantity = np.where(reorder, s + q - position, 0)
+        if lead_time == 0:
+            stock += quantity
+        else:
+            arrivals[(day + lead_time) % (lead_time + 1)] += quantity
+            on_order += quantity
+        orders += reorder
+
+    return {
+        'stockout': stocked_out.mean(axis=1),
+        'lost': lost.mean(axis=1),
+        'holding_cost': held.mean(axis=1) * daily_cost,
+        'orders': orders.mean(axis=1),
+    }
+
+
+def summarize(results):
+    """Catalogue-level totals for a simulation run."""
+    count = len(results)
+    return {
+        'skus': count,
+        'at_risk': sum(1 for r in results if r['stockout_probability'] >= 0.5),
+        'mean_stockout_probability': sum(r['stockout_probability'] for r in results) / count if count else 0,
+        'expected_lost_units': sum(r['expected_lost_units'] for r in results),
+        'expected_holding_cost': sum(r['expected_holding_cost'] for r in results),
+    }
@@ -0,0 +1,353 @@
+"""
+Sales Sketches — approximate fast movers and sales totals in constant time
+Each local day of sales is kept as one SalesSketch row: a Count-Min sketch
+of units sold per product, plus that day's exact units, revenue and number
+of sales. Closed days also store the running total of every day up to and
+including them. Sketches add and subtract cell by cell, so any window is
+
+    cumulative(yesterday) − cumulative(day before the window) + today
+
+three rows, however many days the window spans. Each day also keeps its
+TOP_K best-selling product ids; fast movers are the top estimates among the
+window's days' candidates. Gathering those ids is the one part that is not
+constant time: it reads one small row per day in the window (ids only, no
+sketches), so a 365-day window reads 365 short lists.
+
+Error bounds: a product's estimate is never below its true units and, with
+probability at least 1 − DELTA (≈98%), at most EPSILON (≈0.13%) × the units
+sold in the window above it. Units, revenue and sale counts are exact; windows
+are whole local days rather than a rolling cutoff to the second. A product
+that is never among a day's TOP_K can be missed as a fast mover.
+
+With ANALYTICS_SKETCHES on, every Sale saved, edited or deleted through the
+ORM (views, admin, cascades) appends a SalesSketchDelta row in its own
+transaction — an INSERT, so checkouts never queue on a shared day row and
+never load NumPy. Edits and deletions append the old figures negated. Queries
+first fold pending deltas into their days' rows (fold()); a change on an
+earlier day also clears the running totals from that day on, recomputed on
+the same query. bulk_create() and update() send no signals, so after those
+run `python manage.py rebuild_sketches`, which rebuilds every row from the
+Sale table.
+"""
+import math
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils import timezone
+
+from .models import Product, Sale, SalesSketch, SalesSketchDelta
+from .streaming import iter_sale_chunks
+
+DEPTH = 4
+WIDTH = 2048
+EPSILON = math.e / WIDTH
+DELTA = math.exp(-DEPTH)
+TOP_K = 32  # candidate product ids kept per day for fast_moving_products
+
+# Row i hashes product id x to ((A[i]·x + B[i]) mod PRIME) mod WIDTH. These are
+# fixed, not random per process, so stored sketches stay readable.
+PRIME = 2 ** 31 - 1
+HASH_A = (1103515245, 1664525, 22695477, 134775813)
+HASH_B = (12345, 1013904223, 2531011, 1140671485)
+
+# Cells are uint32; cumulative cells may wrap, but the difference of two
+# cumulative sketches is still exact modulo 2**32, i.e. for any window
+# selling fewer than 4 billion units of one product.
+CELL_DTYPE = '<u4'
+
+
+def _cells(product_ids):
+    """Column hit in each sketch row by each product: DEPTH × len(product_ids)."""
+    import numpy as np
+
+    ids = np.asarray(product_ids, dtype=np.int64)
+    a = np.array(HASH_A, dtype=np.int64)[:, None]
+    b = np.array(HASH_B, dtype=np.int64)[:, None]
+    return (a * ids + b) % PRIME % WIDTH
+
+
+def encode(counts):
+    return zlib.compress(counts.astype(CELL_DTYPE).tobytes())
+
+
+def decode(blob):
+    import numpy as np
+
+    return np.frombuffer(zlib.decompress(bytes(blob)), dtype=CELL_DTYPE).reshape(DEPTH, WIDTH).copy()
+
+
+class Totals:
+    """A Count-Min sketch of units per product with exact units, revenue and sale count."""
+
+    def __init__(self, counts=None, units=0, revenue=Decimal(0), transactions=0):
+        import numpy as np
+
+        self.counts = np.zeros((DEPTH, WIDTH), dtype=CELL_DTYPE) if counts is None else counts
+        self.units = units
+        self.revenue = revenue
+        self.transactions = transactions
+
+    @classmethod
+    def daily(cls, row):
+        return cls(decode(row.counts), row.units, row.revenue, row.transactions)
+
+    @classmethod
+    def cumulative(cls, row):
+        return cls(decode(row.cumulative_counts), row.cumulative_units, row.cumulative_revenue,
+                   row.cumulative_transactions)
+
+    def add_sales(self, sales):
+        """Fold in (product_id, quantity, price) tuples."""
+        self.add_deltas([(product_id, quantity, price * quantity, 1) for product_id, quantity, price in sales])
+
+    def add_deltas(self, deltas):
+        """Fold in signed (product_id, quantity, revenue, transactions) changes."""
+        import numpy as np
+
+        if not deltas:
+            return
+        product_ids, quantities, revenues, transactions = zip(*deltas)
+        # Negative quantities wrap to their uint32 complement, i.e. subtract exactly
+        np.add.at(self.counts, (np.arange(DEPTH)[:, None], _cells(product_ids)),
+                  np.array(quantities, dtype=np.int64).astype(CELL_DTYPE))
+        self.units += sum(quantities)
+        self.revenue += sum(revenues)
+        self.transactions += sum(transactions)
+
+    def estimate(self, product_ids):
+        """Estimated units per product: never under, over by ≤ error_bound() w.p. ≥ 1 − DELTA."""
+        import numpy as np
+
+        return self.counts[np.arange(DEPTH)[:, None], _cells(product_ids)].min(axis=0)
+
+    def top(self, product_ids, k=TOP_K):
+        """The (at most k) distinct product_ids with the highest estimates, best first."""
+        import numpy as np
+
+        ids = np.unique(np.asarray(list(product_ids), dtype=np.int64))
+        if not ids.size:
+            return []
+        order = np.argsort(-self.estimate(ids).astype(np.int64), kind='stable')[:k]
+        return ids[order].tolist()
+
+    def error_bound(self):
+        return math.ceil(EPSILON * self.units)
+
+    def __add__(self, other):
+        return Totals(self.counts + other.counts, self.units + other.units,
+                      self.revenue + other.revenue, self.transactions + other.transactions)
+
+    def __sub__(self, other):
+        return Totals(self.counts - other.counts, self.units - other.units,
+                      self.revenue - other.revenue, self.transactions - other.transactions)
+
+
+# ============================================================
+# RECORDING
+# ============================================================
+
+def record_sale(sale, sign=1):
+    """
+    Append a sale (sign=-1: its reversal) as a pending delta; fold() adds it
+    to its day's sketch. `sale` is a Sale or a (product_id, quantity_sold,
+    sale_price, sale_date) tuple. The signal handlers below call it.
+    """
+    if isinstance(sale, Sale):
+        sale = _figures(sale)
+    product_id, quantity, price, sale_date = sale
+    SalesSketchDelta.objects.create(
+        day=timezone.localdate(sale_date), product_id=product_id,
+        quantity=sign * quantity, revenue=sign * price * quantity, transactions=sign,
+    )
+
+
+def fold():
+    """Fold every pending delta into its day's sketch. Returns the number folded."""
+    with transaction.atomic():
+        # Locked, so a concurrent fold waits and then finds them gone
+        pending = list(
+            SalesSketchDelta.objects.select_for_update().order_by('pk')
+            .values_list('pk', 'day', 'product_id', 'quantity', 'revenue', 'transactions')
+        )
+        if not pending:
+            return 0
+        by_day = defaultdict(list)
+        for _, day, *delta in pending:
+            by_day[day].append(delta)
+        for day, deltas in sorted(by_day.items()):
+            row, _ = SalesSketch.objects.select_for_update().get_or_create(
+                day=day, defaults={'counts': encode(Totals().counts)})
+            totals = Totals.daily(row)
+            totals.add_deltas(deltas)
+            row.counts = encode(totals.counts)
+            row.units, row.revenue, row.transactions = totals.units, totals.revenue, totals.transactions
+            sold = [product_id for product_id, quantity, _, _ in deltas if quantity > 0]
+            row.top_products = totals.top([*row.top_products, *sold])
+            row.save(update_fields=['counts', 'units', 'revenue', 'transactions', 'top_products'])
+        first_day = min(by_day)
+        if first_day < timezone.localdate():
+            SalesSketch.objects.filter(day__gte=first_day).update(cumulative_counts=None)
+        SalesSketchDelta.objects.filter(pk__in=[pk for pk, *_ in pending]).delete()
+    return len(pending)
+
+
+def rebuild():
+    """Recompute every day's sketch from the Sale table. Returns the number of days."""
+    days = defaultdict(Totals)
+    sold = defaultdict(set)
+    for chunk in iter_sale_chunks(('product_id', 'quantity_sold', 'sale_price', 'sale_date')):
+        by_day = defaultdict(list)
+        for _, product_id, quantity, price, sale_date in chunk:
+            by_day[timezone.localdate(sale_date)].append((product_id, quantity, price))
+        for day, sales in by_day.items():
+            days[day].add_sales(sales)
+            sold[day].update(product_id for product_id, _, _ in sales)
+
+    with transaction.atomic():
+        SalesSketchDelta.objects.all().delete()
+        SalesSketch.objects.all().delete()
+        SalesSketch.objects.bulk_create([
+            SalesSketch(day=day, counts=encode(totals.counts), units=totals.units,
+                        revenue=totals.revenue, transactions=totals.transactions,
+                        top_products=totals.top(sold[day]))
+            for day, totals in sorted(days.items())
+        ], batch_size=500)
+    return len(days)
+
+
+# ============================================================
+# QUERIES
+# ============================================================
+
+def _catch_up(through):
+    """Fill in cumulative totals for every row up to `through`, a closed day."""
+    first_stale = (
+        SalesSketch.objects.filter(day__lte=through, cumulative_counts__isnull=True)
+        .order_by('day').values_list('day', flat=True).first()
+    )
+    if first_stale is None:
+        return
+    with transaction.atomic():
+        previous = SalesSketch.objects.filter(day__lt=first_stale).order_by('-day').first()
+        running = Totals.cumulative(previous) if previous else Totals()
+        rows = SalesSketch.objects.select_for_update().filter(day__gte=first_stale, day__lte=through)
+        for row in rows.order_by('day'):
+            running = running + Totals.daily(row)
+            row.cumulative_counts = encode(running.counts)
+            row.cumulative_units = running.units
+            row.cumulative_revenue = running.revenue
+            row.cumulative_transactions = running.transactions
+            row.save(update_fields=['cumulative_counts', 'cumulative_units',
+                                    'cumulative_revenue', 'cumulative_transactions'])
+
+
+def _cumulative(through):
+    """Totals of every day up to and including `through` (a closed day)."""
+    _catch_up(through)
+    row = SalesSketch.objects.filter(day__lte=through).order_by('-day').first()
+    return Totals.cumulative(row) if row else Totals()
+
+
+def _today(today):
+    row = SalesSketch.objects.filter(day=today).first()
+    return Totals.daily(row) if row else Totals()
+
+
+def window(days=None):
+    """Totals for the last `days` local days including today (None: all time)."""
+    fold()
+    today = timezone.localdate()
+    totals = _cumulative(today - timedelta(days=1)) + _today(today)
+    if days is not None:
+        totals = totals - _cumulative(today - timedelta(days=days))
+    return totals
+
+
+def candidates(days=None):
+    """
+    Product ids among any day's TOP_K in the last `days` local days (None:
+    all time). One row per day in the window — O(days), unlike window().
+    """
+    rows = SalesSketch.objects.all()
+    if days is not None:
+        rows = rows.filter(day__gt=timezone.localdate() - timedelta(days=days))
+    return {pk for top in rows.values_list('top_products', flat=True) for pk in top}
+
+
+def fast_moving_products(days=30, top_n=5):
+    """Top products by estimated units over the window, each with its error_bound."""
+    totals = window(days)
+    if not totals.units:
+        return []
+    ranked = totals.top(candidates(days), k=None)
+    estimates = dict(zip(ranked, totals.estimate(ranked).tolist()))
+    bound = totals.error_bound()
+    fast_moving = []
+    # Names for top_n ids at a time; ids of deleted products are skipped
+    for start in range(0, len(ranked), top_n):
+        chunk = [pk for pk in ranked[start:start + top_n] if estimates[pk] > 0]
+        names = dict(Product.objects.filter(pk__in=chunk).values_list('pk', 'name'))
+        fast_moving += [
+            {'product': names[pk], 'quantity_sold': estimates[pk], 'error_bound': bound}
+            for pk in chunk if pk in names
+        ]
+        if len(fast_moving) >= top_n or len(chunk) < top_n:
+            break
+    return fast_moving[:top_n]
+
+
+def sales_totals(days=30):
+    """Same keys as streaming.sales_totals; exact, over whole local days."""
+    fold()
+    today = timezone.localdate()
+    all_time = _cumulative(today - timedelta(days=1)) + _today(today)
+    recent = all_time - _cumulative(today - timedelta(days=days))
+    return {
+        'total_revenue': float(all_time.revenue),
+        'monthly_revenue': float(recent.revenue),
+        'total_units_sold': all_time.units,
+    }
+
+
+# ============================================================
+# SALE SIGNALS (connected by InventoryConfig.ready when ANALYTICS_SKETCHES is on)
+# ============================================================
+
+def _figures(sale):
+    return sale.product_id, sale.quantity_sold, sale.sale_price, sale.sale_date
+
+
+def _remember_sketched_figures(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._sketched_figures = (
+        Sale.objects.filter(pk=instance.pk)
+        .values_list('product_id', 'quantity_sold', 'sale_price', 'sale_date').first()
+    )
+
+
+def _sketch_saved_sale(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = instance.__dict__.pop('_sketched_figures', None)
+    current = _figures(instance)
+    if previous == current:
+        return
+    if previous is not None:
+        record_sale(previous, sign=-1)
+    record_sale(current)
+
+
+def _sketch_deleted_sale(sender, instance, **kwargs):
+    record_sale(instance, sign=-1)
+
+
+def connect_signals():
+    """Append a delta for every Sale save, edit and delete from now on."""
+    pre_save.connect(_remember_sketched_figures, sender=Sale, dispatch_uid='sketches-pre-save')
+    post_save.connect(_sketch_saved_sale, sender=Sale, dispatch_uid='sketches-post-save')
+    post_delete.connect(_sketch_deleted_sale, sender=Sale, dispatch_uid='sketches-post-delete')
@@ -0,0 +1,158 @@
+"""
+Streaming Analysis — bounded-memory aggregations over sales history
+Sales are read in primary-key order, one chunk of plain tuples at a time,
+and folded into running accumulators. Peak memory is one chunk plus the
+accumulators (one entry per month or product), however long the history is.
+Results match the pandas functions in inventory.analysis, which dispatch here
+when ANALYTICS_STREAMING is on or streaming=True is passed.
+
+The chunk size is derived from ANALYTICS_MEMORY_BUDGET_MB. The category
+breakdown is not here: it is a single GROUP BY in the database already.
+"""
+from collections import defaultdict
+from datetime import date, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Product, Sale
+
+# Measured cost of one sale tuple while a chunk is being fetched (~440 B), rounded up
+ROW_BYTES = 512
+MIN_CHUNK_SIZE = 500
+
+
+def chunk_size_for_budget(budget_mb=None):
+    """Rows per chunk so a fetched chunk stays within the memory budget."""
+    if budget_mb is None:
+        budget_mb = settings.ANALYTICS_MEMORY_BUDGET_MB
+    return max(MIN_CHUNK_SIZE, int(budget_mb * 1024 * 1024) // ROW_BYTES)
+
+
+def iter_sale_chunks(fields, chunk_size=None):
+    """
+    Yield lists of (pk, *fields) tuples in primary-key order.
+    Keyset pagination — every chunk is an indexed range scan.
+    """
+    chunk_size = chunk_size or chunk_size_for_budget()
+    queryset = Sale.objects.order_by('pk').values_list('pk', *fields)
+    last_pk = 0
+    while True:
+        chunk = list(queryset.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1][0]
+
+
+def fold(chunks, accumulator):
+    """Feed every chunk to the accumulator and return its result."""
+    for chunk in chunks:
+        accumulator.add(chunk)
+    return accumulator.result()
+
+
+# ============================================================
+# ACCUMULATORS
+# ============================================================
+
+class MonthlyAccumulator:
+    """Revenue, units and transaction count per UTC calendar month."""
+    fields = ('quantity_sold', 'sale_price', 'sale_date')
+
+    def __init__(self):
+        self.months = defaultdict(lambda: [Decimal(0), 0, 0])
+
+    def add(self, chunk):
+        for _, quantity, price, sale_date in chunk:
+            sale_date = sale_date.astimezone(dt_timezone.utc)
+            month = self.months[(sale_date.year, sale_date.month)]
+            month[0] += price * quantity
+            month[1] += quantity
+            month[2] += 1
+
+    def result(self):
+        if not self.months:
+            return []
+        # Like DataFrame.resample('M'), months without sales are reported as zero
+        (year, month), last = min(self.months), max(self.months)
+        report = []
+        while (year, month) <= last:
+            revenue, units, transactions = self.months.get((year, month), (Decimal(0), 0, 0))
+            report.append({
+                'month': date(year, month, 1).strftime('%b %Y'),
+                'total_revenue': float(revenue),
+                'units_sold': units,
+                'transactions': transactions,
+            })
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        return report
+
+
+class ProductRevenueAccumulator:
+    """Revenue per product, reported per product name like the pandas groupby."""
+    fields = ('product_id', 'quantity_sold', 'sale_price')
+
+    def __init__(self, top_n=10):
+        self.top_n = top_n
+        self.revenue = defaultdict(Decimal)
+
+    def add(self, chunk):
+        for _, product_id, quantity, price in chunk:
+            self.revenue[product_id] += price * quantity
+
+    def result(self):
+        by_name = defaultdict(Decimal)
+        product_ids = list(self.revenue)
+        for start in range(0, len(product_ids), 1000):
+            names = Product.objects.filter(pk__in=product_ids[start:start + 1000]).values_list('pk', 'name')
+            for pk, name in names:
+                by_name[name] += self.revenue[pk]
+        top = sorted(by_name.items(), key=lambda item: item[1], reverse=True)[:self.top_n]
+        return [{'product': name, 'revenue': float(revenue)} for name, revenue in top]
+
+
+class SalesTotalsAccumulator:
+    """All-time revenue and units, plus revenue since `recent_since`."""
+    fields = ('quantity_sold', 'sale_price', 'sale_date')
+
+    def __init__(self, recent_since):
+        self.recent_since = recent_since
+        self.revenue = Decimal(0)
+        self.recent_revenue = Decimal(0)
+        self.units = 0
+
+    def add(self, chunk):
+        for _, quantity, price, sale_date in chunk:
+            revenue = price * quantity
+            self.revenue += revenue
+            self.units += quantity
+            if sale_date >= self.recent_since:
+                self.recent_revenue += revenue
+
+    def result(self):
+        return {
+            'total_revenue': float(self.revenue),
+            'monthly_revenue': float(self.recent_revenue),
+            'total_units_sold': self.units,
+        }
+
+
+# ============================================================
+# REPORTS
+# ============================================================
+
+def monthly_sales_report(chunk_size=None):
+    accumulator = MonthlyAccumulator()
+    return fold(iter_sale_chunks(accumulator.fields, chunk_size), accumulator)
+
+
+def product_sales_chart_data(top_n=10, chunk_size=None):
+    accumulator = ProductRevenueAccumulator(top_n)
+    return fold(iter_sale_chunks(accumulator.fields, chunk_size), accumulator)
+
+
+def sales_totals(days=30, chunk_size=None):
+    accumulator = SalesTotalsAccumulator(timezone.now() - timedelta(days=days))
+    return fold(iter_sale_chunks(accumulator.fields, chunk_size), accumulator)
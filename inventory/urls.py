@@ -15,6 +15,7 @@ urlpatterns = [
     # Products
     path('products/', views.product_list, name='product_list'),
     path('products/add/', views.product_add, name='product_add'),
+    path('products/restock/import/', views.restock_import, name='restock_import'),
     path('products/<int:pk>/', views.product_detail, name='product_detail'),
     path('products/<int:pk>/edit/', views.product_edit, name='product_edit'),
     path('products/<int:pk>/delete/', views.product_delete, name='product_delete'),
@@ -26,8 +27,15 @@ urlpatterns = [
 
     # Reports
     path('reports/analysis/', views.analysis_report, name='analysis_report'),
+    path('reports/simulation/', views.replenishment_simulation, name='replenishment_simulation'),
+
+    # Request profiler (staff)
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<int:pk>/', views.profile_detail, name='profile_detail'),
+    path('profiles/<int:pk>/download/<str:kind>/', views.profile_download, name='profile_download'),
 
     # API endpoints
     path('api/chart-data/', views.api_chart_data, name='api_chart_data'),
     path('api/product-price/', views.api_product_price, name='api_product_price'),
+    path('api/live/', views.live_events, name='live_events'),
 ]
@@ -2,15 +2,26 @@
 Views for Inventory & Stock Analysis System
 Handles all HTTP requests and business logic
 """
+import io
+from datetime import datetime, time
+
 from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
+from django.core.cache import cache
 from django.db import transaction
-from django.http import JsonResponse
+from django.db.models import Count, F, Sum
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
 
-from .models import Category, Product, Sale
-from .forms import CategoryForm, ProductForm, SaleForm, StockUpdateForm, DateFilterForm
-from . import analysis
+from .models import Category, CategoryClosure, Product, RequestProfile, Sale, StockMovement
+from .forms import (
+    CategoryForm, ProductForm, SaleForm, StockUpdateForm, RestockImportForm, DateFilterForm, StockAsOfForm,
+    SimulationForm,
+)
+from . import analysis, caching, imports, ledger, live, profiling, rows, simulation
 
 
 # ============================================================
@@ -20,16 +31,17 @@ from . import analysis
 @login_required
 def dashboard(request):
     """Main dashboard with KPIs and chart data"""
-    stats = analysis.get_dashboard_stats()
-    fast_moving = analysis.get_fast_moving_products(days=30, top_n=5)
-    low_stock = analysis.get_low_stock_products()
-    recent_sales = Sale.objects.select_related('product').order_by('-sale_date')[:10]
+    # Cached bundle; live updates resume from the event id it was built at,
+    # so every delta since then is replayed on top of it
+    data = caching.get('dashboard')
 
     return render(request, 'dashboard.html', {
-        'stats': stats,
-        'fast_moving': fast_moving,
-        'low_stock': low_stock[:5],
-        'recent_sales': recent_sales,
+        'stats': data['stats'],
+        'fast_moving': data['fast_moving'],
+        'low_stock': data['low_stock'][:5],
+        'recent_sales': data['recent_sales'],
+        'chart_data': _chart_data(data),
+        'live_last_id': data['live_last_id'],
         'page_title': 'Dashboard',
     })
 
@@ -40,7 +52,13 @@ def dashboard(request):
 
 @login_required
 def category_list(request):
-    categories = Category.objects.all()
+    categories = Category.tree()
+    # Products in each category's whole subtree, in one query
+    subtree_counts = dict(
+        CategoryClosure.objects.values_list('ancestor_id').annotate(n=Count('descendant__products'))
+    )
+    for cat in categories:
+        cat.product_count = subtree_counts.get(cat.pk, 0)
     return render(request, 'products/category_list.html', {
         'categories': categories,
         'page_title': 'Categories'
@@ -66,20 +84,21 @@ def category_add(request):
 
 @login_required
 def product_list(request):
-    products = Product.objects.select_related('category').all()
+    products = Product.objects.all()
 
     category_filter = request.GET.get('category')
     if category_filter:
-        products = products.filter(category__id=category_filter)
+        # The chosen category and everything beneath it
+        products = products.filter(category__ancestor_links__ancestor_id=category_filter)
 
     low_stock_filter = request.GET.get('low_stock')
     if low_stock_filter:
-        products = [p for p in products if p.is_low_stock]
+        products = rows.low_stock_only(products)
 
-    categories = Category.objects.all()
+    categories = caching.get('category_tree')
 
     return render(request, 'products/list.html', {
-        'products': products,
+        'products': rows.product_rows(products),
         'categories': categories,
         'page_title': 'Products',
     })
@@ -90,7 +109,9 @@ def product_add(request):
     if request.method == 'POST':
         form = ProductForm(request.POST)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                product = form.save()
+                ledger.log_adjustment(product, notes='Opening stock')
             messages.success(request, "Product added successfully!")
             return redirect('product_list')
     else:
@@ -104,7 +125,13 @@ def product_edit(request, pk):
     if request.method == 'POST':
         form = ProductForm(request.POST, instance=product)
         if form.is_valid():
-            form.save()
+            with transaction.atomic():
+                form.save()
+                if 'quantity' in form.changed_data:
+                    ledger.log_adjustment(product, notes='Product edited')
+                else:
+                    # The form wrote back the total it was loaded with; restore it
+                    ledger.rollup_quantities([product.pk])
             messages.success(request, f"'{product.name}' updated successfully!")
             return redirect('product_list')
     else:
@@ -131,9 +158,27 @@ def product_delete(request, pk):
 def product_detail(request, pk):
     product = get_object_or_404(Product, pk=pk)
     sales = Sale.objects.filter(product=product).order_by('-sale_date')
+
+    # Point-in-time stock from the ledger, as of the end of the chosen day
+    as_of_form = StockAsOfForm(request.GET or None)
+    stock_as_of = None
+    if as_of_form.is_valid():
+        day_end = datetime.combine(as_of_form.cleaned_data['as_of'], time.max)
+        stock_as_of = ledger.stock_at(product, timezone.make_aware(day_end))
+
+    location_stocks = (
+        product.location_stocks
+        .values('location__name')
+        .annotate(quantity=Sum('quantity'))
+        .order_by('location__name')
+    )
+
     return render(request, 'products/detail.html', {
         'product': product,
         'sales': sales,
+        'location_stocks': location_stocks,
+        'as_of_form': as_of_form,
+        'stock_as_of': stock_as_of,
         'page_title': product.name
     })
 
@@ -146,8 +191,13 @@ def stock_update(request, pk):
         form = StockUpdateForm(request.POST)
         if form.is_valid():
             qty = form.cleaned_data['quantity_to_add']
-            product.quantity += qty
-            product.save()
+            was_low_stock = product.is_low_stock
+            ledger.record_movement(
+                product, qty, StockMovement.RESTOCK,
+                location=form.cleaned_data['location'],
+                notes=form.cleaned_data['notes'][:255],
+            )
+            transaction.on_commit(lambda: live.publish_restock(product, qty, was_low_stock), robust=True)
             messages.success(
                 request,
                 f"Stock updated! Added {qty} units to '{product.name}'. New stock: {product.quantity}"
@@ -160,6 +210,39 @@ def stock_update(request, pk):
     })
 
 
+@login_required
+def restock_import(request):
+    """Goods receipt: restock many products at once from a supplier CSV"""
+    result = None
+    if request.method == 'POST':
+        form = RestockImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            upload = form.cleaned_data['csv_file']
+            # Stream the upload line by line — large files stay on disk
+            stream = io.TextIOWrapper(upload.file, encoding='utf-8-sig', errors='replace', newline='')
+            result = imports.import_restock_csv(
+                stream,
+                notes=f"CSV import: {upload.name}",
+                skip_invalid=form.cleaned_data['skip_invalid'],
+                default_location=form.cleaned_data['location'],
+            )
+            if result['applied']:
+                messages.success(
+                    request,
+                    f"Restock imported! {result['units']} units across {result['products']} products "
+                    f"from {result['lines']} lines."
+                )
+            elif result['error_count']:
+                messages.error(request, f"Nothing imported — {result['error_count']} line(s) have errors.")
+            else:
+                messages.warning(request, "The file has no restock lines.")
+    else:
+        form = RestockImportForm()
+    return render(request, 'products/restock_import.html', {
+        'form': form, 'result': result, 'page_title': 'Import Restock CSV'
+    })
+
+
 # ============================================================
 # SALES VIEWS
 # ============================================================
@@ -175,13 +258,15 @@ def record_sale(request):
         form = SaleForm(request.POST)
         if form.is_valid():
             product = form.cleaned_data['product']
+            location = form.cleaned_data['location']
             qty_sold = form.cleaned_data['quantity_sold']
+            was_low_stock = product.is_low_stock
 
             try:
                 with transaction.atomic():
-                    form.save()
-                    product.quantity -= qty_sold
-                    product.save()
+                    sale = form.save()
+                    ledger.record_movement(product, -qty_sold, StockMovement.SALE, location=location, sale=sale)
+                    transaction.on_commit(lambda: live.publish_sale(sale, product, was_low_stock), robust=True)
 
                     messages.success(
                         request,
@@ -208,7 +293,7 @@ def record_sale(request):
 @login_required
 def sale_history(request):
     """View all sales with optional date range filter"""
-    sales = Sale.objects.select_related('product__category').order_by('-sale_date')
+    sales = Sale.objects.order_by('-sale_date')
     form = DateFilterForm(request.GET or None)
 
     if form.is_valid():
@@ -219,7 +304,7 @@ def sale_history(request):
         if end:
             sales = sales.filter(sale_date__date__lte=end)
 
-    total_revenue = sum(s.total_revenue for s in sales)
+    sales, total_revenue = rows.sale_rows(sales)
 
     return render(request, 'sales/history.html', {
         'sales': sales,
@@ -236,16 +321,93 @@ def sale_history(request):
 @login_required
 def analysis_report(request):
     """Full analysis page with all Pandas-generated data"""
+    category = None
+    if request.GET.get('category', '').isdigit():
+        category = get_object_or_404(Category, pk=request.GET['category'])
+    # No live updates on this page, so don't show a copy older than the last sale
+    dashboard_data = caching.get('dashboard', fresh=True)
     return render(request, 'reports/analysis.html', {
-        'fast_moving': analysis.get_fast_moving_products(days=30, top_n=5),
-        'monthly_report': analysis.get_monthly_sales_report(),
-        'category_breakdown': analysis.get_category_sales_breakdown(),
-        'low_stock': analysis.get_low_stock_products(),
-        'stats': analysis.get_dashboard_stats(),
+        'fast_moving': dashboard_data['fast_moving'],
+        'monthly_report': dashboard_data['monthly_report'],
+        'category_breakdown': (
+            analysis.get_category_sales_breakdown(category) if category else dashboard_data['category_breakdown']
+        ),
+        'category_path': category.ancestors() if category else [],
+        'low_stock': dashboard_data['low_stock'],
+        'stats': dashboard_data['stats'],
         'page_title': 'Stock Analysis Report',
     })
 
 
+@login_required
+def replenishment_simulation(request):
+    """Monte Carlo stock-out risk and holding cost per SKU (see inventory/simulation.py)"""
+    form = SimulationForm(request.GET or None)
+    results = summary = None
+    if form.is_valid():
+        # Seeded, so the same parameters give the same report; shared by every worker
+        # for ANALYTICS_CACHE_SECONDS. The management command is for full runs.
+        params = form.cleaned_data
+        key = caching.KEY_PREFIX + 'simulation:' + ':'.join(f"{name}={params[name]}" for name in sorted(params))
+        summary, results = cache.get_or_set(key, lambda: _simulation_report(**params),
+                                            settings.ANALYTICS_CACHE_SECONDS)
+    return render(request, 'reports/simulation.html', {
+        'form': form,
+        'summary': summary,
+        'results': results or [],
+        'page_title': 'Replenishment Simulation',
+    })
+
+
+def _simulation_report(skus, **params):
+    """Simulate the `skus` products with the least stock above their reorder point"""
+    lowest_cover = Product.objects.order_by(F('quantity') - F('low_stock_threshold'), 'pk')
+    queryset = Product.objects.filter(pk__in=list(lowest_cover.values_list('pk', flat=True)[:skus]))
+    results = simulation.run(**params, seed=0, queryset=queryset)
+    results.sort(key=lambda r: (r['stockout_probability'], r['expected_lost_units']), reverse=True)
+    return simulation.summarize(results), results[:50]
+
+
+# ============================================================
+# REQUEST PROFILER (staff only — see inventory/profiling.py)
+# ============================================================
+
+@staff_member_required
+def profile_list(request):
+    """Recent on-demand request profiles"""
+    profiles = RequestProfile.objects.select_related('user').defer('queries', 'pstats', 'folded_stacks')
+    return render(request, 'reports/profile_list.html', {
+        'profiles': profiles,
+        'page_title': 'Request Profiles',
+    })
+
+
+@staff_member_required
+def profile_detail(request, pk):
+    """SQL by origin, hottest functions and downloads for one profile"""
+    profile = get_object_or_404(RequestProfile, pk=pk)
+    return render(request, 'reports/profile_detail.html', {
+        'profile': profile,
+        'query_origins': profiling.summarize_queries(profile.queries),
+        'functions': profiling.top_functions(profile.pstats),
+        'page_title': f'Profile #{profile.pk}',
+    })
+
+
+@staff_member_required
+def profile_download(request, pk, kind):
+    """cProfile dump (.prof, for snakeviz/pstats) or collapsed stacks (.folded, for flamegraph.pl/speedscope)"""
+    profile = get_object_or_404(RequestProfile, pk=pk)
+    if kind == 'prof':
+        response = HttpResponse(bytes(profile.pstats), content_type='application/octet-stream')
+    elif kind == 'folded':
+        response = HttpResponse(profile.folded_stacks, content_type='text/plain; charset=utf-8')
+    else:
+        raise Http404
+    response['Content-Disposition'] = f'attachment; filename="profile-{profile.pk}.{kind}"'
+    return response
+
+
 # ============================================================
 # API ENDPOINTS (JSON for Chart.js)
 # ============================================================
@@ -253,11 +415,17 @@ def analysis_report(request):
 @login_required
 def api_chart_data(request):
     """Returns JSON data for all dashboard charts"""
-    monthly = analysis.get_monthly_sales_report()
-    category_data = analysis.get_category_sales_breakdown()
-    product_data = analysis.get_product_sales_chart_data()
+    data = caching.get('dashboard', fresh=True)
+    return JsonResponse({**_chart_data(data), 'live_last_id': data['live_last_id']})
+
+
+def _chart_data(data):
+    """Chart.js series from the dashboard bundle"""
+    monthly = data['monthly_report']
+    category_data = data['category_breakdown']
+    product_data = data['product_chart']
 
-    return JsonResponse({
+    return {
         'monthly': {
             'labels': [m['month'] for m in monthly],
             'revenues': [float(m['total_revenue']) for m in monthly],
@@ -271,19 +439,41 @@ def api_chart_data(request):
             'labels': [p['product'] for p in product_data],
             'revenues': [float(p['revenue']) for p in product_data],
         },
-    })
+    }
+
+
+@login_required
+def live_events(request):
+    """Server-Sent Events stream of dashboard deltas (see inventory/live.py)"""
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('last_id')
+    try:
+        last_id = int(last_id) if last_id else None
+    except ValueError:
+        last_id = None
+
+    response = StreamingHttpResponse(live.event_stream(last_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @login_required
 def api_product_price(request):
-    """Returns price and stock of a product — used for auto-fill in sale form"""
+    """
+    Returns price and stock of a product — used for auto-fill in sale form.
+    With `location_id`, stock is the quantity on hand at that location.
+    """
     product_id = request.GET.get('product_id')
+    location_id = request.GET.get('location_id')
     try:
         product = Product.objects.get(pk=product_id)
+        stock = product.quantity
+        if location_id:
+            stock = ledger.location_stock(product, location_id)
         return JsonResponse({
             'price': float(product.price),
-            'stock': product.quantity,
+            'stock': stock,
             'name': product.name
         })
-    except Product.DoesNotExist:
+    except (Product.DoesNotExist, ValueError):
         return JsonResponse({'error': 'Product not found'}, status=404)
@@ -42,6 +42,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'inventory.profiling.ProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'inventory_project.urls'
@@ -85,8 +86,54 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = [BASE_DIR / 'static']
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic writes content-hashed copies plus .gz/.br siblings; WhiteNoise
+# serves the hashed names with a far-future immutable Cache-Control and picks
+# the precompressed variant from Accept-Encoding. Run collectstatic after any
+# static change (build.sh does) — unknown names raise instead of serving stale.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
+
+# Vercel (vercel.json) runs no collectstatic and its /static/ route serves the
+# static/ folder as is, so there is no manifest to look names up in and the
+# strict storage above would fail every page. Vercel sets VERCEL=1 at build and
+# run time; there, templates link the plain names that route serves.
+if os.environ.get('VERCEL') == '1':
+    STORAGES['staticfiles'] = {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Shared by every worker (and by `manage.py warm_cache`, run at start).
+# The table is created by `manage.py createcachetable` (build.sh, start.sh).
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'inventory_cache',
+    }
+}
+
+# Import pandas at worker boot instead of on the first analysis request.
+# Enable for long-lived gunicorn workers; leave off for serverless cold starts.
+ANALYTICS_PRELOAD = os.environ.get('ANALYTICS_PRELOAD', 'False') == 'True'
+
+# Whole-history reports fold sales in chunks instead of building a DataFrame.
+# The budget caps the rows held per chunk (see inventory/streaming.py).
+ANALYTICS_STREAMING = os.environ.get('ANALYTICS_STREAMING', 'False') == 'True'
+ANALYTICS_MEMORY_BUDGET_MB = float(os.environ.get('ANALYTICS_MEMORY_BUDGET_MB', '32'))
+
+# Fast movers and dashboard sales totals come from per-day sketches in constant
+# time; fast movers become estimates with an error bound (inventory/sketches.py).
+ANALYTICS_SKETCHES = os.environ.get('ANALYTICS_SKETCHES', 'False') == 'True'
+
+# Age after which a precomputed report (inventory/caching.py) is rebuilt in the
+# background; the previous copy is served meanwhile, entries never expire.
+ANALYTICS_CACHE_SECONDS = int(os.environ.get('ANALYTICS_CACHE_SECONDS', '300'))
+
+# Staff can profile one request with ?_profile=1 or an X-Profile header.
+# False removes the middleware entirely.
+REQUEST_PROFILER = os.environ.get('REQUEST_PROFILER', 'True') == 'True'
+
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/login/'
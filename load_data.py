@@ -17,6 +17,7 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'inventory_project.settings')
 django.setup()
 
 from django.utils import timezone
+from inventory import ledger, sketches
 from inventory.models import Category, Product, Sale
 
 print("Clearing existing data...")
@@ -65,6 +66,7 @@ for name, cat, price, cost, qty, threshold in products_data:
         quantity=qty,
         low_stock_threshold=threshold,
     )
+    ledger.log_adjustment(p, notes='Opening stock')
     product_objs.append(p)
 
 print(f"✓ {len(product_objs)} products created")
@@ -95,6 +97,8 @@ for product in product_objs:
         sale_count += 1
 
 print(f"✓ {sale_count} sales records created (across last 90 days)")
+
+sketches.rebuild()
 print()
 print("=" * 50)
 print("  Sample data loaded successfully!")
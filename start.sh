@@ -0,0 +1,16 @@
+#!/usr/bin/env bash
+# Release/start step: run on every start, right before the app takes traffic.
+set -o errexit
+
+# The shared report cache lives in the database (settings.CACHES); no-op once created
+python manage.py createcachetable
+
+# Fill the shared report cache now, so the first visitor after this deploy
+# isn't the one computing it (entries never expire; see inventory/caching.py)
+python manage.py warm_cache || echo "Cache warm-up failed; caches will build on first request"
+
+# Every open dashboard holds one thread for its live stream (up to 5 minutes
+# per connection), so WEB_CONCURRENCY (workers, read by gunicorn itself) ×
+# WEB_THREADS must exceed the dashboards left open plus normal concurrent
+# requests — see "Live Dashboard" in README.md.
+exec gunicorn inventory_project.wsgi --worker-class gthread --threads "${WEB_THREADS:-50}" "$@"
@@ -10,13 +10,45 @@ const CHART_COLORS = [
     '#4db6ac', '#f06292'
 ];
 
+/**
+ * Replace labels/data of an existing chart in place.
+ * Returns false when the canvas has no chart yet.
+ */
+function updateChartData(ctx, labels, data) {
+    const chart = ctx._chartInstance;
+    if (!chart) return false;
+    chart.data.labels = labels;
+    chart.data.datasets[0].data = data;
+    chart.update();
+    return true;
+}
+
+/**
+ * Add `delta` to the value for `label`, appending the label if it is new.
+ * Used by live dashboard updates — patches the dataset without a rebuild.
+ */
+function patchChartValue(canvasId, label, delta) {
+    const ctx = document.getElementById(canvasId);
+    const chart = ctx && ctx._chartInstance;
+    if (!chart) return;
+    const values = chart.data.datasets[0].data;
+    const index = chart.data.labels.indexOf(label);
+    if (index === -1) {
+        chart.data.labels.push(label);
+        values.push(delta);
+    } else {
+        values[index] = Number(values[index]) + delta;
+    }
+    chart.update('none');
+}
+
 /**
  * Render a Line Chart (monthly revenue trend)
  */
 function renderLineChart(canvasId, labels, data, label) {
     const ctx = document.getElementById(canvasId);
     if (!ctx) return;
-    if (ctx._chartInstance) ctx._chartInstance.destroy();
+    if (updateChartData(ctx, labels, data)) return;
 
     ctx._chartInstance = new Chart(ctx, {
         type: 'line',
@@ -63,7 +95,7 @@ function renderLineChart(canvasId, labels, data, label) {
 function renderPieChart(canvasId, labels, data) {
     const ctx = document.getElementById(canvasId);
     if (!ctx) return;
-    if (ctx._chartInstance) ctx._chartInstance.destroy();
+    if (updateChartData(ctx, labels, data)) return;
 
     ctx._chartInstance = new Chart(ctx, {
         type: 'doughnut',
@@ -99,7 +131,7 @@ function renderPieChart(canvasId, labels, data) {
 function renderBarChart(canvasId, labels, data, label) {
     const ctx = document.getElementById(canvasId);
     if (!ctx) return;
-    if (ctx._chartInstance) ctx._chartInstance.destroy();
+    if (updateChartData(ctx, labels, data)) return;
 
     ctx._chartInstance = new Chart(ctx, {
         type: 'bar',
@@ -0,0 +1,137 @@
+/*
+ * dashboard.js - Dashboard charts and live updates
+ * URLs come from data-* attributes on the script tag, so the file stays
+ * static and is served fingerprinted and precompressed. Chart series are
+ * embedded in the page (#dashboard-chart-data) from the same snapshot as the
+ * KPIs, so live updates from liveLastId apply to both exactly once.
+ * Requires live-dashboard.js (startLiveDashboard).
+ */
+
+const DASHBOARD_CONFIG = document.currentScript.dataset;
+
+window.addEventListener('load', function () {
+    if (typeof Chart === 'undefined') return;
+
+    Promise.resolve()
+        .then(() => JSON.parse(document.getElementById('dashboard-chart-data').textContent))
+        .then(function(data) {
+
+            // ── Line Chart ──
+            var lineCanvas = document.getElementById('monthlyRevenueChart');
+            var linePH = document.getElementById('linePlaceholder');
+            if (data.monthly.labels.length > 0) {
+                linePH.style.display = 'none';
+                lineCanvas.style.display = 'block';
+                lineCanvas._chartInstance = new Chart(lineCanvas.getContext('2d'), {
+                    type: 'line',
+                    data: {
+                        labels: data.monthly.labels,
+                        datasets: [{
+                            label: 'Revenue',
+                            data: data.monthly.revenues,
+                            borderColor: '#1a56db',
+                            backgroundColor: 'rgba(26,86,219,0.08)',
+                            borderWidth: 2.5,
+                            pointBackgroundColor: '#1a56db',
+                            pointBorderColor: '#fff',
+                            pointBorderWidth: 2,
+                            pointRadius: 5,
+                            pointHoverRadius: 8,
+                            fill: true,
+                            tension: 0.45
+                        }]
+                    },
+                    options: {
+                        responsive: true,
+                        maintainAspectRatio: true,
+                        plugins: {
+                            legend: { display: false },
+                            tooltip: {
+                                backgroundColor: '#1e293b',
+                                titleColor: '#94a3b8',
+                                bodyColor: '#f1f5f9',
+                                padding: 12,
+                                cornerRadius: 10,
+                                callbacks: {
+                                    label: ctx => ' \u20B9' + Number(ctx.raw).toLocaleString('en-IN')
+                                }
+                            }
+                        },
+                        scales: {
+                            y: {
+                                beginAtZero: true,
+                                grid: { color: 'rgba(0,0,0,0.04)', drawBorder: false },
+                                ticks: {
+                                    color: '#9ca3af',
+                                    font: { size: 11 },
+                                    callback: v => '\u20B9' + (v >= 1000 ? (v/1000).toFixed(0)+'K' : v)
+                                }
+                            },
+                            x: {
+                                grid: { display: false, drawBorder: false },
+                                ticks: { color: '#9ca3af', font: { size: 11 } }
+                            }
+                        }
+                    }
+                });
+            } else {
+                linePH.innerHTML = '<i class="bi bi-bar-chart-line"></i><span>No data yet. Record some sales!</span>';
+            }
+
+            // ── Pie Chart ──
+            var pieCanvas = document.getElementById('categoryPieChart');
+            var piePH = document.getElementById('piePlaceholder');
+            if (data.categories.labels.length > 0) {
+                piePH.style.display = 'none';
+                pieCanvas.style.display = 'block';
+                pieCanvas._chartInstance = new Chart(pieCanvas.getContext('2d'), {
+                    type: 'doughnut',
+                    data: {
+                        labels: data.categories.labels,
+                        datasets: [{
+                            data: data.categories.revenues,
+                            backgroundColor: ['#1a56db','#38bdf8','#059669','#d97706','#8b5cf6','#ec4899'],
+                            borderWidth: 3,
+                            borderColor: '#fff',
+                            hoverBorderWidth: 0,
+                            hoverOffset: 8
+                        }]
+                    },
+                    options: {
+                        responsive: true,
+                        cutout: '65%',
+                        plugins: {
+                            legend: {
+                                position: 'bottom',
+                                labels: {
+                                    color: '#374151',
+                                    font: { size: 11 },
+                                    padding: 14,
+                                    usePointStyle: true,
+                                    pointStyleWidth: 8
+                                }
+                            },
+                            tooltip: {
+                                backgroundColor: '#1e293b',
+                                titleColor: '#94a3b8',
+                                bodyColor: '#f1f5f9',
+                                cornerRadius: 10,
+                                callbacks: {
+                                    label: ctx => ' \u20B9' + Number(ctx.raw).toLocaleString('en-IN')
+                                }
+                            }
+                        }
+                    }
+                });
+            } else {
+                piePH.innerHTML = '<i class="bi bi-pie-chart"></i><span>No sales data yet</span>';
+            }
+        })
+        .catch(function(err) {
+            console.error('Chart error:', err);
+        })
+        .finally(function() {
+            // Push updates from here on — no polling, no re-render
+            startLiveDashboard(DASHBOARD_CONFIG.liveUrl, Number(DASHBOARD_CONFIG.liveLastId));
+        });
+});
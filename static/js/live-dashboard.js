@@ -0,0 +1,117 @@
+/*
+ * live-dashboard.js - Applies Server-Sent Event deltas to the dashboard
+ * Charts and tables are patched in place; nothing is refetched or rebuilt.
+ * Requires charts.js (patchChartValue).
+ */
+
+const RANK_BADGE_STYLE = 'border-radius:8px;width:26px;height:26px;display:inline-flex;align-items:center;justify-content:center;';
+
+function startLiveDashboard(streamUrl, lastEventId) {
+    if (typeof EventSource === 'undefined') return;
+
+    const url = streamUrl + (lastEventId ? '?last_id=' + lastEventId : '');
+    const source = new EventSource(url);
+
+    source.addEventListener('sale', e => applySale(JSON.parse(e.data)));
+    source.addEventListener('kpi', e => applyKpiDeltas(JSON.parse(e.data)));
+    source.addEventListener('low_stock', e => applyLowStock(JSON.parse(e.data)));
+    source.addEventListener('fast_movers', e => applyFastMovers(JSON.parse(e.data).items));
+    return source;
+}
+
+function applySale(sale) {
+    patchChartValue('monthlyRevenueChart', sale.month, sale.revenue);
+    patchChartValue('categoryPieChart', sale.category, sale.revenue);
+
+    // Recent sales: newest first, keep 10 rows
+    const body = document.getElementById('recentSalesBody');
+    if (body) {
+        const empty = body.querySelector('[data-empty]');
+        if (empty) empty.remove();
+        const row = document.createElement('tr');
+        row.appendChild(cell(truncate(sale.product, 16), '', 'font-weight:500;'));
+        row.appendChild(cell(badge(sale.quantity, 'background:#f0f9ff;color:#0369a1;'), 'text-center'));
+        row.appendChild(cell(sale.date, 'text-end text-muted', 'font-size:0.78rem;'));
+        body.prepend(row);
+        while (body.rows.length > 10) body.deleteRow(-1);
+    }
+
+    // Fast movers: bump the units of a product already in the ranking
+    const moverRow = document.querySelector(`#fastMovingBody tr[data-product="${CSS.escape(sale.product)}"]`);
+    if (moverRow) {
+        const units = moverRow.querySelector('[data-units]');
+        units.textContent = Number(units.textContent) + sale.quantity;
+    }
+}
+
+function applyKpiDeltas(deltas) {
+    Object.entries(deltas).forEach(([key, delta]) => {
+        document.querySelectorAll(`[data-kpi="${key}"]`).forEach(el => {
+            const value = Number(el.dataset.value) + delta;
+            el.dataset.value = value;
+            el.textContent = (el.dataset.currency ? '₹' : '') + Math.round(value);
+        });
+    });
+}
+
+function applyLowStock(item) {
+    const body = document.getElementById('lowStockBody');
+    if (!body) return;
+    const existing = body.querySelector(`tr[data-product-id="${item.product_id}"]`);
+    if (!item.low) {
+        if (existing) existing.remove();
+        return;
+    }
+    if (existing) return;
+    const empty = body.querySelector('[data-empty]');
+    if (empty) empty.remove();
+    const row = document.createElement('tr');
+    row.className = 'stock-critical';
+    row.dataset.productId = item.product_id;
+    row.appendChild(cell(truncate(item.name, 16), '', 'font-weight:500;'));
+    row.appendChild(cell(badge(item.quantity, 'background:#fef2f2;color:#dc2626;'), 'text-center'));
+    row.appendChild(cell(item.threshold, 'text-center text-muted'));
+    body.prepend(row);
+    while (body.rows.length > 5) body.deleteRow(-1);
+}
+
+function applyFastMovers(items) {
+    const body = document.getElementById('fastMovingBody');
+    if (!body) return;
+    const rows = items.map((item, i) => {
+        const rank = i + 1;
+        const row = document.createElement('tr');
+        row.dataset.product = item.product;
+        const rankBadge = document.createElement('span');
+        rankBadge.className = rank <= 3 ? `badge rank-${rank}` : 'badge';
+        rankBadge.style.cssText = RANK_BADGE_STYLE + (rank <= 3 ? '' : 'background:#f3f4f6;color:#6b7280;');
+        rankBadge.textContent = rank;
+        row.appendChild(cell(rankBadge));
+        row.appendChild(cell(item.product, '', 'font-weight:500;'));
+        const units = badge(item.quantity_sold, 'background:#fff7ed;color:#c2410c;');
+        units.dataset.units = '';
+        row.appendChild(cell(units, 'text-end'));
+        return row;
+    });
+    body.replaceChildren(...rows);
+}
+
+function cell(content, className, style) {
+    const td = document.createElement('td');
+    if (className) td.className = className;
+    if (style) td.style.cssText = style;
+    if (content instanceof Node) td.appendChild(content);
+    else td.textContent = content;
+    return td;
+}
+
+function badge(text, style) {
+    const span = document.createElement('span');
+    span.style.cssText = style + 'padding:2px 8px;border-radius:6px;font-weight:700;font-size:0.8rem;';
+    span.textContent = text;
+    return span;
+}
+
+function truncate(text, length) {
+    return text.length > length ? text.slice(0, length - 1) + '…' : text;
+}